@@ -0,0 +1,149 @@
+"""Time the collection report against the ways it used to be produced.
+
+Fills a throwaway database with PAYMENTS payments spread over DAYS days,
+several payment methods and staff members (cash payments carry their
+denominations JSON), then builds a year of monthly totals by method and
+staff member three ways:
+
+  payments list    every payment through FeesRepository.get_all_payments
+                   (what exporting /api/fees/payments amounts to), summed
+                   in Python
+  GROUP BY scan    one aggregate query over fee_payments
+  rollup           FeesRepository.get_collections on fee_collections
+
+and checks the rollup agrees with the payments.
+
+Run from the project root:
+    python -m benchmarks.fee_collections
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+PAYMENTS = 200_000
+DAYS = 400
+STUDENTS = 2000
+METHODS = ["CASH", "CARD", "UPI", "BANK_TRANSFER", "CHEQUE"]
+STAFF = ["asha", "bhushan", "chetan", "deepa", "ganesh", "office"]
+FIRST_DAY = date(2025, 9, 1)
+YEAR = (date(2025, 10, 1), date(2026, 9, 30))
+
+
+def populate(rng):
+    from database.connection import db_connection
+
+    denominations = json.dumps([{"value": 500, "count": 2}, {"value": 100, "count": 3}])
+    with db_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO student_admissions (
+                first_name, last_name, date_of_birth, gender, marital_status, mother_tongue,
+                aadhar_number, correspondence_address, city, state, district, mobile_number,
+                category, educational_qualification, course_name, timing, certificate_name
+            ) VALUES (?, 'Patil', '2000-01-01', 'M', 'S', 'Marathi', '234567890123', 'x',
+                      'Pune', 'MH', 'Pune', '9876543210', 'GEN', 'BSc', 'MS-CIT', '9-10', 'x')
+            """,
+            [(f"Student{n}",) for n in range(STUDENTS)],
+        )
+        conn.executemany(
+            """
+            INSERT INTO fee_payments (
+                student_id, amount, payment_date, payment_method, discount, late_fee,
+                handled_by, denominations
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    10001 + rng.randrange(STUDENTS),
+                    rng.choice([100, 250.5, 500, 1300]),
+                    (FIRST_DAY + timedelta(days=rng.randrange(DAYS))).isoformat(),
+                    method,
+                    rng.choice([0, 0, 0, 50]),
+                    rng.choice([0, 0, 0, 0, 25]),
+                    rng.choice(STAFF),
+                    denominations if method == "CASH" else None,
+                )
+                for method in (rng.choice(METHODS) for _ in range(PAYMENTS))
+            ],
+        )
+
+
+def from_payments_list():
+    from database.fees_repository import FeesRepository
+
+    first, last = YEAR[0].isoformat(), YEAR[1].isoformat()
+    totals = {}
+    for payment in FeesRepository.get_all_payments():
+        if first <= payment["payment_date"] <= last:
+            key = (payment["payment_date"][:7], payment["payment_method"], payment["handled_by"])
+            totals[key] = totals.get(key, 0) + payment["amount"]
+    return totals
+
+
+def from_group_by():
+    from database.connection import read_connection
+
+    with read_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT substr(payment_date, 1, 7), payment_method, handled_by, SUM(amount)
+            FROM fee_payments
+            WHERE payment_date BETWEEN ? AND ?
+            GROUP BY 1, 2, 3
+            """,
+            (YEAR[0].isoformat(), YEAR[1].isoformat()),
+        ).fetchall()
+    return {(period, method, handler): amount for period, method, handler, amount in rows}
+
+
+def timed(label, fn, repeat=10):
+    result = fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f"  {label:28s} {elapsed:9.2f} ms")
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from database.fees_repository import FeesRepository
+        from database.migrations import migrate
+
+        migrate()
+        populate(random.Random(5))
+        print(f"{PAYMENTS} payments over {DAYS} days; report for {YEAR[0]} to {YEAR[1]}")
+
+        expected = timed("payments list", from_payments_list, repeat=1)
+        timed("GROUP BY scan", from_group_by)
+        monthly = timed(
+            "rollup, by month",
+            lambda: FeesRepository.get_collections("month", *YEAR),
+        )
+        daily = timed(
+            "rollup, by day",
+            lambda: FeesRepository.get_collections("day", *YEAR),
+        )
+
+        assert [period["period"] for period in monthly["collections"]] == sorted({p for p, _, _ in expected})
+        for key in ("payment_count", "amount", "discount", "late_fee"):
+            assert abs(monthly["totals"][key] - daily["totals"][key]) < 1e-6
+        for period in monthly["collections"]:
+            amount = sum(v for (p, _, _), v in expected.items() if p == period["period"])
+            assert abs(period["amount"] - amount) < 1e-6, period["period"]
+            for method, totals in period["by_payment_method"].items():
+                amount = sum(v for (p, m, _), v in expected.items() if (p, m) == (period["period"], method))
+                assert abs(totals["amount"] - amount) < 1e-6, (period["period"], method)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Time CSV payment imports against keying payments in one request each.
+
+Posts SINGLE payments one at a time to /api/fees/payment, then a CSV of
+ROWS payments (with a few duplicate transaction IDs and invalid rows
+mixed in) to /api/fees/import, both through the ASGI app in-process,
+and reports payments per second. The import is posted a second time to
+check that every row is then skipped as a duplicate.
+
+Run from the project root:
+    python -m benchmarks.fee_import
+"""
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+SINGLE = 1000
+ROWS = 20_000
+STUDENTS = 500
+DUPLICATES = 100
+INVALID = 100
+
+
+def populate():
+    from database.connection import db_connection
+
+    with db_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO student_admissions (
+                first_name, last_name, date_of_birth, gender, marital_status, mother_tongue,
+                aadhar_number, correspondence_address, city, state, district, mobile_number,
+                category, educational_qualification, course_name, timing, certificate_name
+            ) VALUES (?, 'Patil', '2000-01-01', 'M', 'S', 'Marathi', '234567890123', 'x',
+                      'Pune', 'MH', 'Pune', '9876543210', 'GEN', 'BSc', 'MS-CIT', '9-10', 'x')
+            """,
+            [(f"Student{n}",) for n in range(STUDENTS)],
+        )
+
+
+def payment(rng, n):
+    return {
+        "student_id": 10001 + rng.randrange(STUDENTS),
+        "amount": rng.choice([100, 250.5, 500]),
+        "payment_date": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "payment_method": rng.choice(["UPI", "BANK_TRANSFER"]),
+        "transaction_id": f"UTR{n:010d}",
+        "handled_by": "bank",
+    }
+
+
+def settlement_csv(rng):
+    columns = ["student_id", "amount", "payment_date", "payment_method", "transaction_id", "handled_by"]
+    lines = [",".join(columns)]
+    for n in range(ROWS):
+        row = payment(rng, SINGLE + n)
+        lines.append(",".join(str(row[column]) for column in columns))
+    picked = rng.sample(range(ROWS), DUPLICATES + INVALID)
+    for n in picked[:DUPLICATES]:
+        lines[1 + n] = lines[1 + n].replace(f"UTR{SINGLE + n:010d}", f"UTR{rng.randrange(SINGLE):010d}")
+    for n in picked[DUPLICATES:]:
+        lines[1 + n] = lines[1 + n].replace("bank", "").replace(",UPI,", ",CRYPTO,").replace(",BANK_TRANSFER,", ",CRYPTO,")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from fastapi.testclient import TestClient
+
+        import main as app_module
+
+        rng = random.Random(3)
+        with TestClient(app_module.app) as client:
+            populate()
+
+            started = time.perf_counter()
+            for n in range(SINGLE):
+                assert client.post("/api/fees/payment", json=payment(rng, n)).status_code == 200
+            elapsed = time.perf_counter() - started
+            print(f"  {'one request per payment':28s} {SINGLE / elapsed:9.0f} payments/s")
+
+            body = settlement_csv(rng)
+            started = time.perf_counter()
+            report = client.post("/api/fees/import", files={"file": ("settlement.csv", io.BytesIO(body))}).json()
+            elapsed = time.perf_counter() - started
+            print(f"  {'CSV import':28s} {report['imported'] / elapsed:9.0f} payments/s")
+            assert report["imported"] == ROWS - DUPLICATES - INVALID, report["message"]
+            assert report["skipped"] == DUPLICATES + INVALID
+
+            again = client.post("/api/fees/import", files={"file": ("settlement.csv", io.BytesIO(body))}).json()
+            assert again["imported"] == 0 and again["skipped"] == ROWS, again["message"]
+
+
+if __name__ == "__main__":
+    main()
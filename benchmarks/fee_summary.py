@@ -0,0 +1,157 @@
+"""Regression benchmark for FeesRepository's fee summary.
+
+Builds STUDENTS admissions with PAYMENTS_PER_STUDENT payments each in a
+throwaway database, then times the former per-student implementation
+(one SUM query per student, status worked out in Python) against the
+summary read from student_fee_balances, checks both give the same rows
+and that the triggers left no balance to repair, and times a page, a
+status-filtered page, the overdue list, the daily status refresh and
+one student's details.
+
+Run from the project root:
+    python -m benchmarks.fee_summary
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+STUDENTS = 10_000
+PAYMENTS_PER_STUDENT = 5
+
+
+def populate(rng):
+    from database.connection import db_connection
+
+    courses = ["MS-CIT", "ADVANCE TALLY - CIT", "DTP - CIT", "NOT IN CATALOG"]
+    with db_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO student_admissions (
+                first_name, middle_name, last_name, date_of_birth, gender, marital_status,
+                mother_tongue, aadhar_number, correspondence_address, city, state, district,
+                mobile_number, category, educational_qualification, course_name, timing,
+                certificate_name, created_at
+            ) VALUES (?, ?, 'Patil', '2000-01-01', 'M', 'S', 'Marathi', '234567890123', 'x',
+                      'Pune', 'MH', 'Pune', '9876543210', 'GEN', 'BSc', ?, '9-10', 'x', ?)
+            """,
+            [
+                (
+                    f"Student{n}",
+                    rng.choice([None, "", "K"]),
+                    rng.choice(courses),
+                    f"{rng.choice([2024, 2025, datetime.now().year])}-{rng.randint(1, 12):02d}-"
+                    f"{rng.randint(1, 28):02d} 10:00:00",
+                )
+                for n in range(STUDENTS)
+            ],
+        )
+        ids = [row[0] for row in conn.execute("SELECT id FROM student_admissions")]
+        conn.executemany(
+            """
+            INSERT INTO fee_payments (student_id, amount, payment_date, payment_method, discount, handled_by)
+            VALUES (?, ?, '2024-06-01', 'CASH', ?, 'staff')
+            """,
+            [
+                (student_id, rng.choice([100, 250.5, 500, 700]), rng.choice([0, 0, 0, 50, None]))
+                for student_id in ids
+                for _ in range(rng.randint(0, 2 * PAYMENTS_PER_STUDENT))
+            ],
+        )
+
+
+def per_student_summary():
+    """The implementation the aggregate query replaced"""
+    from database.connection import read_connection
+
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT sa.id, sa.first_name, sa.middle_name, sa.last_name,
+                   sa.mobile_number, sa.course_name, sa.created_at, c.fees as course_fee
+            FROM student_admissions sa
+            LEFT JOIN courses c ON sa.course_name = c.course_name
+            ORDER BY sa.created_at DESC, sa.id DESC
+            """
+        )
+        fee_summary = []
+        for student in cursor.fetchall():
+            course_fee = student[7] or 2000
+            cursor.execute(
+                "SELECT COALESCE(SUM(amount), 0), COALESCE(SUM(discount), 0) FROM fee_payments WHERE student_id = ?",
+                (student[0],),
+            )
+            total_paid, total_discount = cursor.fetchone()
+            balance = course_fee - total_paid - total_discount
+            if balance <= 0:
+                status = "PAID"
+            elif total_paid > 0 or total_discount > 0:
+                status = "PARTIAL"
+            else:
+                status = "PENDING"
+            admission_date = datetime.strptime(student[6], "%Y-%m-%d %H:%M:%S")
+            today = datetime.now()
+            months_diff = (today.year - admission_date.year) * 12 + (today.month - admission_date.month)
+            if balance > 0 and months_diff > 0:
+                status = "OVERDUE"
+            fee_summary.append({
+                "student_id": student[0],
+                "student_name": f"{student[1]} {student[2] or ''} {student[3]}".strip(),
+                "mobile_number": student[4],
+                "course_name": student[5],
+                "admission_date": student[6],
+                "course_fee": course_fee,
+                "total_paid": total_paid,
+                "total_discount": total_discount,
+                "balance": balance,
+                "status": status,
+                "is_overdue": status == "OVERDUE",
+                "months_overdue": months_diff if status == "OVERDUE" else 0,
+            })
+    return fee_summary
+
+
+def timed(label, fn, repeat=5):
+    result = fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f"  {label:28s} {elapsed:9.1f} ms")
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from database.fee_balances import FeeBalanceRepository
+        from database.fees_repository import FeesRepository
+        from database.migrations import migrate
+
+        migrate()
+        populate(random.Random(11))
+        print(f"{STUDENTS} students, ~{PAYMENTS_PER_STUDENT} payments each")
+
+        before = timed("per-student queries", per_student_summary, repeat=1)
+        after = timed("balances table", FeesRepository.get_fee_summary)
+        assert before == [{key: row[key] for key in before[0]} for row in after], \
+            "summary differs from the per-student one"
+        assert not timed("verify balances", FeeBalanceRepository.verify, repeat=1)
+
+        timed("first page (50)", FeesRepository.get_fee_summary_page)
+        timed("OVERDUE page (50)", lambda: FeesRepository.get_fee_summary_page(status="OVERDUE"))
+        timed("PAID page (50)", lambda: FeesRepository.get_fee_summary_page(status="PAID"))
+        timed("overdue list (50)", FeesRepository.get_overdue_page)
+        timed("refresh statuses", FeeBalanceRepository.refresh_status, repeat=1)
+        student_id = after[len(after) // 2]["student_id"]
+        timed("student details", lambda: FeesRepository.get_student_fee_details(student_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare per-request commits with the single-writer queue under concurrent writes.
+
+Simulates staff marking attendance at the start of a batch: many threads,
+each marking one student at a time. "direct" commits every call on its
+own connection; "queued" sends the same calls through database.writer,
+which group-commits them. Runs against a throwaway database with the
+configured pragma profile (see DB_PRAGMA_PROFILE / DB_SYNCHRONOUS).
+
+Run from the project root:
+    python -m benchmarks.group_commit
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+THREADS = 32
+WRITES_PER_THREAD = 100
+
+
+def run(label, mark, date):
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(thread_id):
+        barrier.wait()
+        for i in range(WRITES_PER_THREAD):
+            record = {
+                "student_id": thread_id * WRITES_PER_THREAD + i,
+                "date": date,
+                "batch_timing": "9-10",
+                "status": "PRESENT",
+            }
+            try:
+                mark([record])
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    writes = THREADS * WRITES_PER_THREAD
+    print(
+        f"  {label:7s} {elapsed * 1000:8.1f} ms  {writes / elapsed:8.0f} writes/s  "
+        f"{len(errors)} errors"
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from database.attendance_repository import AttendanceRepository
+        from database.connection import get_effective_pragmas
+        from database.migrations import migrate
+        from database.writer import get_write_queue, shutdown_write_queue, write
+
+        migrate()
+        settings = get_effective_pragmas()
+        print(
+            f"{THREADS} threads x {WRITES_PER_THREAD} attendance writes, "
+            f"journal_mode={settings['journal_mode']} synchronous={settings['synchronous']}"
+        )
+
+        run("direct", AttendanceRepository.mark_attendance, "2024-01-01")
+        run("queued", lambda records: write(AttendanceRepository.mark_attendance, records), "2024-01-02")
+
+        queue = get_write_queue()
+        print(f"  queued writes committed in {queue.batches} transactions "
+              f"({queue.jobs / max(queue.batches, 1):.1f} per commit)")
+        shutdown_write_queue()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compare the old hand-indexed row-to-dict loops with the compiled RowMapper.
+
+Run from the project root:
+    python -m benchmarks.row_mapping
+"""
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+from database.documents_repository import DOCUMENT_WITH_STUDENT
+
+ROWS = 100_000
+
+
+def build_database():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(
+        """
+        CREATE TABLE student_admissions (
+            id INTEGER PRIMARY KEY, first_name TEXT, middle_name TEXT,
+            last_name TEXT, mobile_number TEXT, course_name TEXT
+        );
+        CREATE TABLE student_documents (
+            id INTEGER PRIMARY KEY, student_id INTEGER, document_type TEXT,
+            filename TEXT, original_filename TEXT, file_size INTEGER,
+            mime_type TEXT, status TEXT, notes TEXT, created_at TEXT, updated_at TEXT
+        );
+        """
+    )
+    conn.executemany(
+        "INSERT INTO student_admissions VALUES (?, ?, ?, ?, ?, ?)",
+        [(i, "First", None if i % 2 else "Middle", "Last", "9876543210", "MS-CIT") for i in range(ROWS)],
+    )
+    conn.executemany(
+        "INSERT INTO student_documents VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (i, i, "IDENTITY_PROOF", f"student_{i}.pdf", "scan.pdf", 1024,
+             "application/pdf", "UPLOADED", "", "2024-01-01 10:00:00", None)
+            for i in range(ROWS)
+        ],
+    )
+    return conn
+
+
+def old_get_all_documents(conn):
+    """DocumentsRepository.get_all_documents before the mapping layer"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT
+            sd.id, sd.student_id, sd.document_type, sd.filename,
+            sd.original_filename, sd.file_size, sd.mime_type,
+            sd.status, sd.notes, sd.created_at, sd.updated_at,
+            sa.first_name, sa.middle_name, sa.last_name,
+            sa.mobile_number, sa.course_name
+        FROM student_documents sd
+        JOIN student_admissions sa ON sd.student_id = sa.id
+        """
+    )
+    rows = cursor.fetchall()
+
+    documents = []
+    for row in rows:
+        documents.append({
+            "id": row[0],
+            "student_id": row[1],
+            "document_type": row[2],
+            "filename": row[3],
+            "original_filename": row[4],
+            "file_size": row[5],
+            "mime_type": row[6],
+            "status": row[7],
+            "notes": row[8],
+            "created_at": row[9],
+            "updated_at": row[10],
+            "student_name": f"{row[11]} {row[12] or ''} {row[13]}".strip(),
+            "mobile_number": row[14],
+            "course_name": row[15],
+        })
+    return documents
+
+
+def new_get_all_documents(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        SELECT {DOCUMENT_WITH_STUDENT.columns}
+        FROM student_documents sd
+        JOIN student_admissions sa ON sd.student_id = sa.id
+        """
+    )
+    return DOCUMENT_WITH_STUDENT.all(cursor)
+
+
+def measure(fn, conn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(conn)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn(conn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    conn = build_database()
+    assert old_get_all_documents(conn) == new_get_all_documents(conn)
+
+    old_time, old_peak = measure(old_get_all_documents, conn)
+    new_time, new_peak = measure(new_get_all_documents, conn)
+    print(f"get_all_documents over {ROWS} rows, Python {sys.version.split()[0]}")
+    print(f"  hand-indexed: {old_time * 1000:8.1f} ms  peak {old_peak / 2**20:6.1f} MiB")
+    print(
+        f"  RowMapper:    {new_time * 1000:8.1f} ms  peak {new_peak / 2**20:6.1f} MiB"
+        f"  ({old_time / new_time:.2f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
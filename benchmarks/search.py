@@ -0,0 +1,111 @@
+"""Time /api/search lookups against the LIKE scan they replace.
+
+Fills a throwaway database with ROWS admissions and ROWS enquiries (the
+FTS5 indexes are kept in sync by the migration's triggers), then runs
+typical reception lookups: a partial name, a name plus surname prefix,
+a mobile number prefix and an Aadhaar prefix.
+
+The search ranks every match. It is timed against a LIKE scan that stops
+at the newest 20 matches (cheap for common names, but unranked) and one
+that reads every match, which is what ranking them by LIKE would cost.
+
+Run from the project root:
+    python -m benchmarks.search
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+ROWS = 100_000
+REPEAT = 50
+
+FIRST_NAMES = ["Rahul", "Rohit", "Priya", "Pooja", "Amit", "Sneha", "Vikas", "Anjali", "Sagar", "Kiran",
+               "Neha", "Ganesh", "Swati", "Mahesh", "Shweta", "Nilesh", "Komal", "Tushar", "Ashwini", "Yogesh"]
+LAST_NAMES = ["Patil", "Deshmukh", "Kulkarni", "Jadhav", "Pawar", "Shinde", "Joshi", "Deshpande",
+              "Gaikwad", "Chavan", "More", "Kale", "Bhosale", "Salunkhe", "Sawant"]
+CITIES = ["Pune", "Nashik", "Satara", "Sangli", "Kolhapur", "Solapur", "Nagpur", "Aurangabad"]
+
+
+def person(rng):
+    return (
+        rng.choice(FIRST_NAMES), "", rng.choice(LAST_NAMES), "2000-01-01", "M", "S", "Marathi",
+        str(rng.randrange(10**11, 10**12)), "x", rng.choice(CITIES), "MH", "d",
+        str(rng.randrange(7 * 10**9, 10**10)), "", "GEN", "BSc", "MS-CIT", "9-10",
+    )
+
+
+def populate(rng):
+    from database.connection import db_connection
+
+    columns = (
+        "first_name, middle_name, last_name, date_of_birth, gender, marital_status, "
+        "mother_tongue, aadhar_number, correspondence_address, city, state, district, "
+        "mobile_number, alternate_mobile_number, category, educational_qualification, "
+        "course_name, timing"
+    )
+    with db_connection() as conn:
+        conn.executemany(
+            f"INSERT INTO student_enquiries ({columns}, handled_by) VALUES ({', '.join('?' * 19)})",
+            (person(rng) + ("staff",) for _ in range(ROWS)),
+        )
+        conn.executemany(
+            f"INSERT INTO student_admissions ({columns}, certificate_name) VALUES ({', '.join('?' * 19)})",
+            ((p := person(rng)) + (f"{p[0]} {p[2]}",) for _ in range(ROWS)),
+        )
+
+
+def like_search(conn, query, limit="LIMIT 20"):
+    """Same matches as the FTS query (every word a column prefix), by table scan"""
+    words = query.split()
+    any_column = (
+        "(first_name LIKE ? OR last_name LIKE ? OR mobile_number LIKE ? "
+        "OR aadhar_number LIKE ? OR city LIKE ?)"
+    )
+    where = " AND ".join([any_column] * len(words))
+    params = [f"{word}%" for word in words for _ in range(5)]
+    results = []
+    for table in ("student_admissions", "student_enquiries"):
+        results += conn.execute(
+            f"SELECT id FROM {table} WHERE {where} ORDER BY id DESC {limit}", params
+        ).fetchall()
+    return results
+
+
+def timed(fn):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - started) / REPEAT * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from database.connection import read_connection
+        from database.migrations import migrate
+        from database.search_repository import SearchRepository
+
+        migrate()
+        started = time.perf_counter()
+        populate(random.Random(7))
+        print(f"{ROWS} admissions + {ROWS} enquiries indexed in {time.perf_counter() - started:.1f} s")
+
+        for query in ("sne", "patil", "rahul desh", "98765", "4567"):
+            hits = len(SearchRepository.search(query))
+            fts = timed(lambda: SearchRepository.search(query))
+            with read_connection() as conn:
+                newest = timed(lambda: like_search(conn, query))
+                every = timed(lambda: like_search(conn, query, limit=""))
+            print(
+                f"  {query!r:14s} fts5 {fts:7.2f} ms   LIKE newest 20 {newest:7.2f} ms"
+                f"   LIKE all matches {every:7.2f} ms   ({hits} results)"
+            )
+
+
+if __name__ == "__main__":
+    main()
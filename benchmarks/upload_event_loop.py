@@ -0,0 +1,121 @@
+"""Measure event-loop latency while documents are being uploaded.
+
+A probe coroutine sleeps in short intervals and records how late it wakes
+up; blocking work on the loop shows up directly as lag. The app runs
+in-process against a throwaway database and upload folder.
+
+Run from the project root:
+    python -m benchmarks.upload_event_loop
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+CONCURRENT_UPLOADS = 20
+ROUNDS = 5
+FILE_SIZE = 4 * 1024 * 1024
+PROBE_INTERVAL = 0.005
+
+ADMISSION_FORM = {
+    "firstName": "Load",
+    "lastName": "Test",
+    "dateOfBirth": "2000-01-01",
+    "gender": "Male",
+    "maritalStatus": "Single",
+    "motherTongue": "Marathi",
+    "aadharNumber": "234567890123",
+    "correspondenceAddress": "Address",
+    "city": "Pune",
+    "state": "Maharashtra",
+    "district": "Pune",
+    "mobileNumber": "9876543210",
+    "category": "OPEN",
+    "educationalQualification": "BSc",
+    "courseName": "MS-CIT",
+    "timing": "9-10",
+    "certificateName": "Load Test",
+}
+
+
+async def probe(lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+def summary(lags):
+    lags = sorted(lags)
+    return (
+        f"p50 {statistics.median(lags):6.2f} ms  "
+        f"p99 {lags[int(len(lags) * 0.99) - 1]:6.2f} ms  "
+        f"max {lags[-1]:6.2f} ms"
+    )
+
+
+async def run(client):
+    payload = os.urandom(FILE_SIZE)
+    response = await client.post(
+        "/api/admission",
+        data=ADMISSION_FORM,
+        files={"photo": ("p.jpg", b"x", "image/jpeg"), "signature": ("s.jpg", b"y", "image/jpeg")},
+    )
+    student_id = response.json()["admission_id"]
+
+    async def upload():
+        response = await client.post(
+            "/api/documents/upload",
+            data={"student_id": str(student_id), "document_type": "OTHER"},
+            files={"file": ("scan.pdf", payload, "application/pdf")},
+        )
+        response.raise_for_status()
+
+    idle, loaded = [], []
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(probe(idle, stop))
+    await asyncio.sleep(1)
+    stop.set()
+    await task
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(probe(loaded, stop))
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*(upload() for _ in range(CONCURRENT_UPLOADS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await task
+
+    uploads = CONCURRENT_UPLOADS * ROUNDS
+    print(f"{uploads} uploads of {FILE_SIZE // 2**20} MiB, {CONCURRENT_UPLOADS} at a time, {elapsed:.1f} s")
+    print(f"  event-loop lag idle:      {summary(idle)}")
+    print(f"  event-loop lag uploading: {summary(loaded)}")
+
+
+def main():
+    import httpx
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from database.migrations import migrate
+        from main import app
+
+        migrate()
+        transport = httpx.ASGITransport(app=app)
+
+        async def go():
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await run(client)
+
+        asyncio.run(go())
+
+
+if __name__ == "__main__":
+    main()
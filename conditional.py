@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from database.table_versions import TableVersionRepository
+
+
+def make_etag(tables: tuple, per_day: bool = False) -> str:
+    """Weak ETag naming the current version of every table a response reads"""
+    versions = TableVersionRepository.get(tables)
+    tag = ".".join(str(versions[table]) for table in tables)
+    if per_day:
+        # Matches SQLite's DATE('now'), which is UTC
+        tag = f"{datetime.now(timezone.utc).date().isoformat()}.{tag}"
+    return f'W/"{tag}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_get(*tables: str, per_day: bool = False) -> Any:
+    """Route dependency answering If-None-Match with 304 from table versions.
+
+    Runs before the endpoint, so a match costs one primary-key lookup on
+    table_versions instead of the query and serialization. Versions are
+    read before the endpoint queries, so an ETag is never newer than its
+    body. Pass per_day for responses that depend on today's date.
+    """
+
+    def check(request: Request, response: Response) -> None:
+        etag = make_etag(tables, per_day)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(check)
@@ -1,8 +1,81 @@
 import os
 
+from dotenv import load_dotenv
+
+load_dotenv()
+
 # Database configuration
 DATABASE_FILE = "student_data.db"
 
+# Connection pool configuration
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+
+# Separate read-only pool for GET paths; in WAL mode readers never take write locks
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+
+# Worker threads that run repository calls for async endpoints. Async units of
+# work wait for their connection outside this executor, so units queued for the
+# pool never tie up its threads
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE)))
+
+# Writes sent through database.writer run on one thread, and the jobs queued
+# while a batch commits share the next transaction (group commit).
+# DB_WRITE_BATCH_MS also waits that long for more jobs; worth it only when
+# commits fsync (synchronous=FULL or a rollback journal)
+DB_WRITE_QUEUE = os.getenv("DB_WRITE_QUEUE", "1").lower() not in ("0", "false", "no")
+DB_WRITE_BATCH_MS = float(os.getenv("DB_WRITE_BATCH_MS", "0"))
+DB_WRITE_BATCH_MAX = int(os.getenv("DB_WRITE_BATCH_MAX", "64"))
+# Longest write() waits for its job to commit, in seconds; 0 waits forever
+DB_WRITE_TIMEOUT = float(os.getenv("DB_WRITE_TIMEOUT", "60"))
+
+# Connection pragma profiles, applied to every pooled connection
+DB_PRAGMA_PROFILES = {
+    # SQLite's own defaults: rollback journal, no mmap
+    "default": {},
+    # WAL so readers don't block behind writers, with a busy timeout so
+    # concurrent writers wait instead of failing with "database is locked"
+    "concurrent": {
+        "journal_mode": "WAL",
+        "busy_timeout": 5000,  # ms
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,  # bytes
+        "cache_size": -20000,  # negative means KiB
+        "temp_store": "MEMORY",
+    },
+}
+DB_PRAGMA_PROFILE = os.getenv("DB_PRAGMA_PROFILE", "concurrent")
+
+# Individual pragmas can be overridden on top of the profile, e.g. DB_MMAP_SIZE=0
+DB_PRAGMAS = dict(DB_PRAGMA_PROFILES[DB_PRAGMA_PROFILE])
+for _pragma in ("journal_mode", "busy_timeout", "synchronous", "mmap_size", "cache_size", "temp_store"):
+    _value = os.getenv(f"DB_{_pragma.upper()}")
+    if _value:
+        DB_PRAGMAS[_pragma] = _value
+
+# Per-statement timing collected at the connection layer, exposed at /api/metrics
+DB_QUERY_METRICS = os.getenv("DB_QUERY_METRICS", "1").lower() not in ("0", "false", "no")
+# Most recent timings kept per statement for the p50/p95/p99 estimates
+DB_QUERY_SAMPLES = int(os.getenv("DB_QUERY_SAMPLES", "1024"))
+
+# Statements slower than this (ms) are written with their query plan to a
+# rotating log; 0 disables. Needs DB_QUERY_METRICS.
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+DB_SLOW_QUERY_LOG = os.getenv("DB_SLOW_QUERY_LOG", "logs/slow_queries.log")
+DB_SLOW_QUERY_LOG_BYTES = 5 * 1024 * 1024
+DB_SLOW_QUERY_LOG_BACKUPS = 5
+
+# The course catalog is cached in each process; writes made by this process
+# refresh it at once, and table_versions is checked at most this often (s)
+# to pick up writes from other workers
+COURSE_CACHE_CHECK_SECONDS = float(os.getenv("COURSE_CACHE_CHECK_SECONDS", "1"))
+
+# Fee statuses (OVERDUE, months overdue, accrued late fees) are refreshed by
+# a background job at startup and after each midnight; payments update a
+# student's status at once. LATE_FEE_PER_MONTH accrues per month overdue
+FEE_STATUS_REFRESH = os.getenv("FEE_STATUS_REFRESH", "1").lower() not in ("0", "false", "no")
+LATE_FEE_PER_MONTH = float(os.getenv("LATE_FEE_PER_MONTH", "0"))
+
 # File upload configuration
 UPLOAD_FOLDER = "uploads"
 BACKUP_FOLDER = "backups"
@@ -1,6 +1,110 @@
-from typing import Any, Dict, List, Optional
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from .connection import get_db_connection
+from .connection import db_connection, read_connection
+from .mapping import RowMapper
+from .pagination import decode_cursor, keyset_page, page_size
+
+ADMISSION_FIELDS = [
+    ("id", "id"),
+    ("first_name", "firstName"),
+    ("middle_name", "middleName"),
+    ("last_name", "lastName"),
+    ("date_of_birth", "dateOfBirth"),
+    ("gender", "gender"),
+    ("marital_status", "maritalStatus"),
+    ("mother_tongue", "motherTongue"),
+    ("aadhar_number", "aadharNumber"),
+    ("correspondence_address", "correspondenceAddress"),
+    ("city", "city"),
+    ("state", "state"),
+    ("district", "district"),
+    ("mobile_number", "mobileNumber"),
+    ("alternate_mobile_number", "alternateMobileNumber"),
+    ("category", "category"),
+    ("educational_qualification", "educationalQualification"),
+    ("course_name", "courseName"),
+    ("timing", "timing"),
+    ("certificate_name", "certificateName"),
+    ("referred_by", "referredBy"),
+    ("photo_filename", "photoFilename"),
+    ("signature_filename", "signatureFilename"),
+    ("created_at", "createdAt"),
+]
+
+ADMISSION = RowMapper(ADMISSION_FIELDS)
+
+# Everything the list endpoint may return via fields=
+ADMISSION_LISTABLE = RowMapper(ADMISSION_FIELDS + [("result", "result")])
+
+ADMISSION_DETAIL = RowMapper(
+    ADMISSION_FIELDS
+    + [
+        ("learner_code", "learner_code"),
+        ("era_id", "era_id"),
+        ("era_password", "era_password"),
+        ("exam_date", "exam_date"),
+        ("era_score", "era_score"),
+        ("final_score", "final_score"),
+        ("result", "result"),
+    ]
+)
+
+# List pages; the listing indexes in migrations.py cover exactly these columns
+ADMISSION_LIST = RowMapper(
+    [
+        ("id", "id"),
+        ("first_name", "firstName"),
+        ("middle_name", "middleName"),
+        ("last_name", "lastName"),
+        ("mobile_number", "mobileNumber"),
+        ("course_name", "courseName"),
+        ("timing", "timing"),
+        ("created_at", "createdAt"),
+        ("result", "result"),
+    ]
+)
+
+# sort -> (ORDER BY, keyset condition, response keys holding the sort key)
+ADMISSION_SORTS = {
+    "id": ("id DESC", "id < ?", ("id",)),
+    "name": (
+        "first_name, last_name, id",
+        "(first_name, last_name, id) > (?, ?, ?)",
+        ("firstName", "lastName", "id"),
+    ),
+}
+
+
+def _list_filters(
+    course_name: Optional[str],
+    timing: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    result: Optional[str],
+) -> Tuple[List[str], List[Any]]:
+    """WHERE conditions and parameters shared by get_page and count"""
+    conditions = []
+    params: List[Any] = []
+
+    if course_name:
+        conditions.append("course_name = ?")
+        params.append(course_name)
+    if timing:
+        conditions.append("timing = ?")
+        params.append(timing)
+    if date_from:
+        conditions.append("created_at >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append("created_at < date(?, '+1 day')")
+        params.append(date_to.isoformat())
+    if result == "pending":
+        conditions.append("result IS NULL")
+    elif result:
+        conditions.append("result = ?")
+        params.append(result)
+    return conditions, params
 
 
 class AdmissionRepository:
@@ -9,24 +113,21 @@ class AdmissionRepository:
     def update_exam_result(
         admission_id: int, exam_date: str, era_score: int, final_score: int, result: str
     ) -> bool:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id FROM student_admissions WHERE id = ?", (admission_id,)
-        )
-        if not cursor.fetchone():
-            conn.close()
-            return False
-        cursor.execute(
-            """
-            UPDATE student_admissions
-            SET exam_date = ?, era_score = ?, final_score = ?, result = ?
-            WHERE id = ?
-            """,
-            (exam_date, era_score, final_score, result, admission_id),
-        )
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id FROM student_admissions WHERE id = ?", (admission_id,)
+            )
+            if not cursor.fetchone():
+                return False
+            cursor.execute(
+                """
+                UPDATE student_admissions
+                SET exam_date = ?, era_score = ?, final_score = ?, result = ?
+                WHERE id = ?
+                """,
+                (exam_date, era_score, final_score, result, admission_id),
+            )
         return True
 
     @staticmethod
@@ -34,262 +135,226 @@ class AdmissionRepository:
         admission_id: int, learner_code: str, era_id: str, era_password: str
     ) -> bool:
         """Update learner credentials for a student admission"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id FROM student_admissions WHERE id = ?", (admission_id,)
-        )
-        if not cursor.fetchone():
-            conn.close()
-            return False
-        cursor.execute(
-            """
-            UPDATE student_admissions
-            SET learner_code = ?, era_id = ?, era_password = ?
-            WHERE id = ?
-            """,
-            (learner_code, era_id, era_password, admission_id),
-        )
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id FROM student_admissions WHERE id = ?", (admission_id,)
+            )
+            if not cursor.fetchone():
+                return False
+            cursor.execute(
+                """
+                UPDATE student_admissions
+                SET learner_code = ?, era_id = ?, era_password = ?
+                WHERE id = ?
+                """,
+                (learner_code, era_id, era_password, admission_id),
+            )
         return True
 
     @staticmethod
     def create(admission_data: Dict[str, Any]) -> int:
         """Create a new admission and return its ID"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO student_admissions (
-                first_name, middle_name, last_name, date_of_birth, gender,
-                marital_status, mother_tongue, aadhar_number,
-                correspondence_address, city, state, district,
-                mobile_number, alternate_mobile_number, category,
-                educational_qualification, course_name, timing,
-                certificate_name, referred_by,
-                photo_filename, signature_filename
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                admission_data["firstName"],
-                admission_data["middleName"],
-                admission_data["lastName"],
-                admission_data["dateOfBirth"],
-                admission_data["gender"],
-                admission_data["maritalStatus"],
-                admission_data["motherTongue"],
-                admission_data["aadharNumber"],
-                admission_data["correspondenceAddress"],
-                admission_data["city"],
-                admission_data["state"],
-                admission_data["district"],
-                admission_data["mobileNumber"],
-                admission_data["alternateMobileNumber"],
-                admission_data["category"],
-                admission_data["educationalQualification"],
-                admission_data["courseName"],
-                admission_data["timing"],
-                admission_data["certificateName"],
-                admission_data["referredBy"],
-                admission_data["photoFilename"],
-                admission_data["signatureFilename"],
-            ),
-        )
-
-        admission_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                INSERT INTO student_admissions (
+                    first_name, middle_name, last_name, date_of_birth, gender,
+                    marital_status, mother_tongue, aadhar_number,
+                    correspondence_address, city, state, district,
+                    mobile_number, alternate_mobile_number, category,
+                    educational_qualification, course_name, timing,
+                    certificate_name, referred_by,
+                    photo_filename, signature_filename
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    admission_data["firstName"],
+                    admission_data["middleName"],
+                    admission_data["lastName"],
+                    admission_data["dateOfBirth"],
+                    admission_data["gender"],
+                    admission_data["maritalStatus"],
+                    admission_data["motherTongue"],
+                    admission_data["aadharNumber"],
+                    admission_data["correspondenceAddress"],
+                    admission_data["city"],
+                    admission_data["state"],
+                    admission_data["district"],
+                    admission_data["mobileNumber"],
+                    admission_data["alternateMobileNumber"],
+                    admission_data["category"],
+                    admission_data["educationalQualification"],
+                    admission_data["courseName"],
+                    admission_data["timing"],
+                    admission_data["certificateName"],
+                    admission_data["referredBy"],
+                    admission_data["photoFilename"],
+                    admission_data["signatureFilename"],
+                ),
+            )
+
+            admission_id = cursor.lastrowid
         return admission_id
 
     @staticmethod
     def get_all() -> List[Dict[str, Any]]:
         """Get all admissions"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, first_name, middle_name, last_name, date_of_birth,
-                   gender, marital_status, mother_tongue, aadhar_number,
-                   correspondence_address, city, state, district,
-                   mobile_number, alternate_mobile_number, category,
-                   educational_qualification, course_name, timing,
-                   certificate_name, referred_by,
-                   photo_filename, signature_filename, created_at
-            FROM student_admissions
-            ORDER BY created_at DESC
-            """
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        admissions = []
-        for row in rows:
-            admissions.append(
-                {
-                    "id": row[0],
-                    "firstName": row[1],
-                    "middleName": row[2],
-                    "lastName": row[3],
-                    "dateOfBirth": row[4],
-                    "gender": row[5],
-                    "maritalStatus": row[6],
-                    "motherTongue": row[7],
-                    "aadharNumber": row[8],
-                    "correspondenceAddress": row[9],
-                    "city": row[10],
-                    "state": row[11],
-                    "district": row[12],
-                    "mobileNumber": row[13],
-                    "alternateMobileNumber": row[14],
-                    "category": row[15],
-                    "educationalQualification": row[16],
-                    "courseName": row[17],
-                    "timing": row[18],
-                    "certificateName": row[19],
-                    "referredBy": row[20],
-                    "photoFilename": row[21],
-                    "signatureFilename": row[22],
-                    "createdAt": row[23],
-                }
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {ADMISSION.columns}
+                FROM student_admissions
+                ORDER BY created_at DESC
+                """
+            )
+
+            return ADMISSION.all(cursor)
+
+    @staticmethod
+    def get_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        course_name: Optional[str] = None,
+        timing: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        result: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of the admissions list and the cursor for the next.
+
+        sort="id" lists newest admissions first, sort="name" alphabetically;
+        result is "pass", "fail" or "pending" (no result recorded yet).
+        `fields` picks response keys from ADMISSION_LISTABLE instead of the
+        default ADMISSION_LIST; id and the sort key are always included.
+        """
+        order_by, after_cursor, key = ADMISSION_SORTS[sort]
+        mapper = ADMISSION_LISTABLE.subset(fields, required=key) if fields else ADMISSION_LIST
+        limit = page_size(limit)
+        conditions, params = _list_filters(course_name, timing, date_from, date_to, result)
+        if cursor:
+            conditions.append(after_cursor)
+            params.extend(decode_cursor(cursor, len(key)))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            rows = mapper.all(
+                conn.execute(
+                    f"""
+                    SELECT {mapper.columns}
+                    FROM student_admissions
+                    {where}
+                    ORDER BY {order_by}
+                    LIMIT ?
+                    """,
+                    (*params, limit + 1),
+                )
             )
 
-        return admissions
+        return keyset_page(rows, limit, key)
+
+    @staticmethod
+    def count(
+        course_name: Optional[str] = None,
+        timing: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        result: Optional[str] = None,
+    ) -> int:
+        """Number of admissions matching the get_page filters, across all pages"""
+        conditions, params = _list_filters(course_name, timing, date_from, date_to, result)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM student_admissions {where}", params).fetchone()[0]
 
     @staticmethod
     def get_by_id(admission_id: int) -> Optional[Dict[str, Any]]:
         """Get admission by ID"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, first_name, middle_name, last_name, date_of_birth,
-                   gender, marital_status, mother_tongue, aadhar_number,
-                   correspondence_address, city, state, district,
-                   mobile_number, alternate_mobile_number, category,
-                   educational_qualification, course_name, timing,
-                   certificate_name, referred_by,
-                   photo_filename, signature_filename, created_at,
-                   learner_code, era_id, era_password,
-                   exam_date, era_score, final_score, result
-            FROM student_admissions
-            WHERE id = ?
-            """,
-            (admission_id,),
-        )
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if not row:
-            return None
-
-        return {
-            "id": row[0],
-            "firstName": row[1],
-            "middleName": row[2],
-            "lastName": row[3],
-            "dateOfBirth": row[4],
-            "gender": row[5],
-            "maritalStatus": row[6],
-            "motherTongue": row[7],
-            "aadharNumber": row[8],
-            "correspondenceAddress": row[9],
-            "city": row[10],
-            "state": row[11],
-            "district": row[12],
-            "mobileNumber": row[13],
-            "alternateMobileNumber": row[14],
-            "category": row[15],
-            "educationalQualification": row[16],
-            "courseName": row[17],
-            "timing": row[18],
-            "certificateName": row[19],
-            "referredBy": row[20],
-            "photoFilename": row[21],
-            "signatureFilename": row[22],
-            "createdAt": row[23],
-            "learner_code": row[24],
-            "era_id": row[25],
-            "era_password": row[26],
-            "exam_date": row[27],
-            "era_score": row[28],
-            "final_score": row[29],
-            "result": row[30],
-        }
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {ADMISSION_DETAIL.columns}
+                FROM student_admissions
+                WHERE id = ?
+                """,
+                (admission_id,),
+            )
+
+            return ADMISSION_DETAIL.one(cursor.fetchone())
 
     @staticmethod
     def update(admission_id: int, admission_data: Dict[str, Any]) -> bool:
         """Update an existing admission"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Check if admission exists
-        cursor.execute(
-            "SELECT id FROM student_admissions WHERE id = ?", (admission_id,)
-        )
-        if not cursor.fetchone():
-            conn.close()
-            return False
-
-        # Update admission data
-        cursor.execute(
-            """
-            UPDATE student_admissions SET
-                first_name = ?, middle_name = ?, last_name = ?, date_of_birth = ?,
-                gender = ?, marital_status = ?, mother_tongue = ?, aadhar_number = ?,
-                correspondence_address = ?, city = ?, state = ?, district = ?,
-                mobile_number = ?, alternate_mobile_number = ?, category = ?,
-                educational_qualification = ?, course_name = ?, timing = ?,
-                certificate_name = ?, referred_by = ?
-            WHERE id = ?
-            """,
-            (
-                admission_data["firstName"],
-                admission_data["middleName"],
-                admission_data["lastName"],
-                admission_data["dateOfBirth"],
-                admission_data["gender"],
-                admission_data["maritalStatus"],
-                admission_data["motherTongue"],
-                admission_data["aadharNumber"],
-                admission_data["correspondenceAddress"],
-                admission_data["city"],
-                admission_data["state"],
-                admission_data["district"],
-                admission_data["mobileNumber"],
-                admission_data["alternateMobileNumber"],
-                admission_data["category"],
-                admission_data["educationalQualification"],
-                admission_data["courseName"],
-                admission_data["timing"],
-                admission_data["certificateName"],
-                admission_data["referredBy"],
-                admission_id,
-            ),
-        )
-
-        # Update photo filename if provided
-        if "photoFilename" in admission_data and admission_data["photoFilename"]:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Check if admission exists
             cursor.execute(
-                "UPDATE student_admissions SET photo_filename = ? WHERE id = ?",
-                (admission_data["photoFilename"], admission_id),
+                "SELECT id FROM student_admissions WHERE id = ?", (admission_id,)
             )
+            if not cursor.fetchone():
+                return False
 
-        # Update signature filename if provided
-        if (
-            "signatureFilename" in admission_data
-            and admission_data["signatureFilename"]
-        ):
+            # Update admission data
             cursor.execute(
-                "UPDATE student_admissions SET signature_filename = ? WHERE id = ?",
-                (admission_data["signatureFilename"], admission_id),
+                """
+                UPDATE student_admissions SET
+                    first_name = ?, middle_name = ?, last_name = ?, date_of_birth = ?,
+                    gender = ?, marital_status = ?, mother_tongue = ?, aadhar_number = ?,
+                    correspondence_address = ?, city = ?, state = ?, district = ?,
+                    mobile_number = ?, alternate_mobile_number = ?, category = ?,
+                    educational_qualification = ?, course_name = ?, timing = ?,
+                    certificate_name = ?, referred_by = ?
+                WHERE id = ?
+                """,
+                (
+                    admission_data["firstName"],
+                    admission_data["middleName"],
+                    admission_data["lastName"],
+                    admission_data["dateOfBirth"],
+                    admission_data["gender"],
+                    admission_data["maritalStatus"],
+                    admission_data["motherTongue"],
+                    admission_data["aadharNumber"],
+                    admission_data["correspondenceAddress"],
+                    admission_data["city"],
+                    admission_data["state"],
+                    admission_data["district"],
+                    admission_data["mobileNumber"],
+                    admission_data["alternateMobileNumber"],
+                    admission_data["category"],
+                    admission_data["educationalQualification"],
+                    admission_data["courseName"],
+                    admission_data["timing"],
+                    admission_data["certificateName"],
+                    admission_data["referredBy"],
+                    admission_id,
+                ),
             )
 
-        conn.commit()
-        conn.close()
+            # Update photo filename if provided
+            if "photoFilename" in admission_data and admission_data["photoFilename"]:
+                cursor.execute(
+                    "UPDATE student_admissions SET photo_filename = ? WHERE id = ?",
+                    (admission_data["photoFilename"], admission_id),
+                )
+
+            # Update signature filename if provided
+            if (
+                "signatureFilename" in admission_data
+                and admission_data["signatureFilename"]
+            ):
+                cursor.execute(
+                    "UPDATE student_admissions SET signature_filename = ? WHERE id = ?",
+                    (admission_data["signatureFilename"], admission_id),
+                )
+
         return True
@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from config import DB_EXECUTOR_WORKERS
+from .connection import (PooledConnection, current_unit_of_work,
+                         end_unit_of_work, get_db_connection)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Get the bounded executor that runs blocking database calls"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+                )
+    return _executor
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_in_db_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking database call without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    # Carry context variables over to the worker thread, like Starlette does
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_db_executor(), call)
+
+
+class _AsyncUnit:
+    """An async_unit_of_work() whose connection is taken on first use"""
+
+    __slots__ = ("conn", "token")
+
+    def __init__(self):
+        self.conn: Optional[PooledConnection] = None
+        self.token: Optional[contextvars.Token] = None
+
+    async def join(self) -> None:
+        """Check out the unit's connection, if this is its first call.
+
+        The wait for a free connection runs on a plain worker thread, not
+        the database executor, so units queueing for the pool never hold
+        up executor threads that would return connections to it.
+        """
+        if self.conn is None:
+            self.conn = await asyncio.to_thread(get_db_connection)
+            self.token = current_unit_of_work.set(self.conn)
+
+    async def end(self, commit: bool) -> None:
+        if self.conn is None:
+            return
+        current_unit_of_work.reset(self.token)
+        await run_in_db_executor(end_unit_of_work, self.conn, commit)
+
+
+_async_unit: contextvars.ContextVar[Optional[_AsyncUnit]] = contextvars.ContextVar("async_unit", default=None)
+
+
+@asynccontextmanager
+async def async_unit_of_work() -> AsyncIterator[None]:
+    """unit_of_work() for async endpoints.
+
+    AsyncRepository calls awaited inside the block run on the unit's
+    connection, since the executor copies this context. Await them one
+    at a time; the connection must not be used by two threads at once.
+
+    The connection is checked out at the first AsyncRepository call and
+    held until the block exits, so keep file and network work outside it.
+    """
+    if current_unit_of_work.get() is not None or _async_unit.get() is not None:
+        yield
+        return
+
+    unit = _AsyncUnit()
+    token = _async_unit.set(unit)
+    try:
+        yield
+    except BaseException:
+        _async_unit.reset(token)
+        await unit.end(commit=False)
+        raise
+    _async_unit.reset(token)
+    await unit.end(commit=True)
+
+
+class AsyncRepository:
+    """Awaitable view of a repository class.
+
+    Every method of the wrapped repository is exposed as a coroutine that
+    runs the original on the database executor:
+
+        admissions = AsyncRepository(AdmissionRepository)
+        admission = await admissions.get_by_id(admission_id)
+    """
+
+    def __init__(self, repository: type):
+        self._repository = repository
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self._repository, name)
+
+        @functools.wraps(method)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            unit = _async_unit.get()
+            if unit is not None:
+                await unit.join()
+            return await run_in_db_executor(method, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
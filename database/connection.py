@@ -1,411 +1,411 @@
+import itertools
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import quote
 
-DATABASE_FILE = "student_data.db"
-
-
-def init_database():
-    """Initialize the SQLite database and create tables if they don't exist"""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-
-    # Enable foreign keys
-    cursor.execute("PRAGMA foreign_keys = ON")
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS student_enquiries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            middle_name TEXT,
-            last_name TEXT NOT NULL,
-            date_of_birth TEXT NOT NULL,
-            gender TEXT NOT NULL,
-            marital_status TEXT NOT NULL,
-            mother_tongue TEXT NOT NULL,
-            aadhar_number TEXT NOT NULL,
-            correspondence_address TEXT NOT NULL,
-            city TEXT NOT NULL,
-            state TEXT NOT NULL,
-            district TEXT NOT NULL,
-            mobile_number TEXT NOT NULL,
-            alternate_mobile_number TEXT,
-            category TEXT NOT NULL,
-            educational_qualification TEXT NOT NULL,
-            course_name TEXT NOT NULL,
-            timing TEXT NOT NULL,
-            handled_by TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """
-    )
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS student_admissions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            middle_name TEXT,
-            last_name TEXT NOT NULL,
-            date_of_birth TEXT NOT NULL,
-            gender TEXT NOT NULL,
-            marital_status TEXT NOT NULL,
-            mother_tongue TEXT NOT NULL,
-            aadhar_number TEXT NOT NULL,
-            correspondence_address TEXT NOT NULL,
-            city TEXT NOT NULL,
-            state TEXT NOT NULL,
-            district TEXT NOT NULL,
-            mobile_number TEXT NOT NULL,
-            alternate_mobile_number TEXT,
-            category TEXT NOT NULL,
-            educational_qualification TEXT NOT NULL,
-            course_name TEXT NOT NULL,
-            timing TEXT NOT NULL,
-            certificate_name TEXT NOT NULL,
-            referred_by TEXT,
-            photo_filename TEXT,
-            signature_filename TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-    )
+from config import (DATABASE_FILE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+                    DB_PRAGMA_PROFILE, DB_PRAGMAS, DB_QUERY_METRICS,
+                    DB_READ_POOL_SIZE)
+from .instrumentation import TimedCursor
 
-    conn.commit()
-    conn.close()
 
-    set_admission_id_start()
-    init_users_table()
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Dict[str, Any]) -> None:
+    """Apply a pragma profile to a freshly opened connection"""
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
 
 
-def get_db_connection():
-    """Get database connection"""
-    return sqlite3.connect(DATABASE_FILE)
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection that goes back to its pool when closed"""
 
+    pool: Optional["ConnectionPool"] = None
+    generation = 0
+    cursor_factory = TimedCursor if DB_QUERY_METRICS else sqlite3.Cursor
 
-def init_courses_table():
-    """Initialize the courses table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS courses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_name TEXT NOT NULL UNIQUE,
-            fees INTEGER NOT NULL CHECK(fees > 0),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-    )
-
-    # Create trigger to update updated_at timestamp
-    cursor.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS update_courses_timestamp
-        AFTER UPDATE ON courses
-        BEGIN
-            UPDATE courses SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-        """
-    )
-
-    # Insert default courses if table is empty
-    cursor.execute("SELECT COUNT(*) FROM courses")
-    count = cursor.fetchone()[0]
-
-    if count == 0:
-        default_courses = [
-            ("MS-CIT", 2500),
-            ("ADVANCE TALLY - CIT", 3500),
-            ("ADVANCE TALLY - KLIC", 3000),
-            ("ADVANCE EXCEL - CIT", 2000),
-            ("ENGLISH TYPING - MKCL", 1500),
-            ("ENGLISH TYPING - CIT", 1800),
-            ("MARATHI TYPING - MKCL", 1500),
-            ("DTP - CIT", 2200),
-            ("IT - KLIC", 4000),
-            ("KLIC DIPLOMA", 5000),
-        ]
-
-        cursor.executemany(
-            "INSERT INTO courses (course_name, fees) VALUES (?, ?)", default_courses
-        )
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Registered through after_commit() while this is a unit of work
+        self.commit_callbacks: List[Callable[[], None]] = []
 
-    conn.commit()
-    conn.close()
+    def cursor(self, factory=None):
+        return super().cursor(factory or self.cursor_factory)
 
+    # The C shortcuts build a plain Cursor without going through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
 
-def init_followups_table():
-    """Initialize the followups table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS followups (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            enquiry_id INTEGER NOT NULL,
-            followup_date TEXT NOT NULL,
-            status TEXT NOT NULL CHECK(status IN ('PENDING', 'INTERESTED', 'NOT_INTERESTED', 'ADMITTED')),
-            notes TEXT DEFAULT '',
-            next_followup_date TEXT,
-            handled_by TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (enquiry_id) REFERENCES student_enquiries (id) ON DELETE CASCADE
-        )
-        """
-    )
-
-    # Create trigger to update updated_at timestamp
-    cursor.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS update_followups_timestamp
-        AFTER UPDATE ON followups
-        BEGIN
-            UPDATE followups SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-        """
-    )
-
-    # Create index for better query performance
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_followups_enquiry_id ON followups(enquiry_id);
-        """
-    )
-
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_followups_next_date ON followups(next_followup_date);
-        """
-    )
-
-    conn.commit()
-    conn.close()
-
-
-def init_fee_payments_table():
-    """Initialize the fee_payments table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS fee_payments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            amount REAL NOT NULL CHECK(amount > 0),
-            payment_date TEXT NOT NULL,
-            payment_method TEXT NOT NULL CHECK(payment_method IN ('CASH', 'CARD', 'UPI', 'BANK_TRANSFER', 'CHEQUE')),
-            transaction_id TEXT DEFAULT '',
-            notes TEXT DEFAULT '',
-            late_fee REAL DEFAULT 0,
-            discount REAL DEFAULT 0,
-            handled_by TEXT NOT NULL,
-            denominations TEXT,
-            serials_500 TEXT,
-            cheque_number TEXT,
-            bank_name TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (student_id) REFERENCES student_admissions (id) ON DELETE CASCADE
-        )
-        """
-    )
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
 
-    # Add discount column if it does not exist (migration for existing DBs)
-    try:
-        cursor.execute("ALTER TABLE fee_payments ADD COLUMN discount REAL DEFAULT 0")
-    except Exception:
-        pass  # Ignore if already exists
+    def close(self):
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            super().close()
 
-    # Create index for better query performance
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_fee_payments_student_id ON fee_payments(student_id);
-        """
-    )
+    def discard(self):
+        """Close the underlying connection for good"""
+        self.pool = None
+        super().close()
 
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_fee_payments_date ON fee_payments(payment_date);
-        """
-    )
 
-    conn.commit()
-    conn.close()
+class ConnectionPool:
+    """Fixed-size pool of reusable SQLite connections.
 
+    Connections are checked out by one thread at a time, which fits
+    FastAPI's threadpool for sync endpoints, and keep their schema and
+    statement caches between requests.
 
-def init_settings_table():
-    """Initialize the institute settings table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS institute_settings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            center_code TEXT DEFAULT '',
-            address TEXT DEFAULT '',
-            phone TEXT DEFAULT '',
-            email TEXT DEFAULT '',
-            website TEXT DEFAULT '',
-            logo TEXT DEFAULT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-    )
-
-    # Create trigger to update updated_at timestamp
-    cursor.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS update_institute_settings_timestamp
-        AFTER UPDATE ON institute_settings
-        BEGIN
-            UPDATE institute_settings SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-        """
-    )
-
-    # Insert default settings if table is empty
-    cursor.execute("SELECT COUNT(*) FROM institute_settings")
-    count = cursor.fetchone()[0]
-
-    if count == 0:
-        cursor.execute(
-            """
-            INSERT INTO institute_settings (name, address, phone, email, website)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            ("EduManage", "", "", "", ""),
+    A read-only pool opens connections with a mode=ro URI and
+    query_only, so anything that tries to write through it fails.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        max_size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        pragmas: Optional[Dict[str, Any]] = None,
+        read_only: bool = False,
+    ):
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self.read_only = read_only
+        self.pragmas = dict(DB_PRAGMAS if pragmas is None else pragmas)
+        if read_only:
+            # The journal mode belongs to the database file; only writers set it
+            self.pragmas.pop("journal_mode", None)
+            self.pragmas["query_only"] = "ON"
+        self.pid = os.getpid()
+        self._idle: List[PooledConnection] = []
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Condition()
+
+        # Metrics
+        self._acquired = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self) -> PooledConnection:
+        if self.read_only:
+            path = quote(os.path.abspath(self.database))
+            conn = sqlite3.connect(
+                f"file:{path}?mode=ro",
+                uri=True,
+                factory=PooledConnection,
+                check_same_thread=False,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.database, factory=PooledConnection, check_same_thread=False
+            )
+        try:
+            apply_pragmas(conn, self.pragmas)
+        except sqlite3.Error:
+            conn.discard()
+            raise
+        conn.pool = self
+        conn.generation = self._generation
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Check a connection out, waiting up to `timeout` seconds for one"""
+        started = time.perf_counter()
+        waited = False
+        with self._lock:
+            while not self._idle and self._size >= self.max_size:
+                waited = True
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0 or not self._lock.wait(remaining):
+                    if not self._idle and self._size >= self.max_size:
+                        self._timeouts += 1
+                        raise sqlite3.OperationalError(
+                            "Timed out waiting for a database connection"
+                        )
+
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._size += 1
+                conn = None
+
+            elapsed = time.perf_counter() - started
+            self._acquired += 1
+            if waited:
+                self._waits += 1
+                self._wait_total += elapsed
+                self._wait_max = max(self._wait_max, elapsed)
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._lock.notify()
+                raise
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        """Return a connection, discarding any uncommitted work"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except sqlite3.Error:
+            healthy = False
+
+        with self._lock:
+            if healthy and conn.generation == self._generation:
+                self._idle.append(conn)
+            else:
+                conn.discard()
+                self._size -= 1
+            self._lock.notify()
+
+    def close_all(self) -> None:
+        """Close idle connections; checked-out ones are closed on release"""
+        with self._lock:
+            self._generation += 1
+            for conn in self._idle:
+                conn.discard()
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size and wait-time metrics"""
+        with self._lock:
+            return {
+                "read_only": self.read_only,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_read_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool, creating it on first use"""
+    global _pool
+    # Each worker process gets its own pool; connections never cross a fork
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = ConnectionPool(DATABASE_FILE)
+    return _pool
+
+
+def get_read_pool() -> ConnectionPool:
+    """Get the process-wide read-only connection pool"""
+    global _read_pool
+    if _read_pool is None or _read_pool.pid != os.getpid():
+        with _pool_lock:
+            if _read_pool is None or _read_pool.pid != os.getpid():
+                _read_pool = ConnectionPool(
+                    DATABASE_FILE, max_size=DB_READ_POOL_SIZE, read_only=True
+                )
+    return _read_pool
+
+
+def close_pool() -> None:
+    """Close all pooled connections, e.g. before the database file is replaced"""
+    for pool in (_pool, _read_pool):
+        if pool is not None:
+            pool.close_all()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get connection pool metrics"""
+    return {"write": get_pool().stats(), "read": get_read_pool().stats()}
+
+
+def get_effective_pragmas() -> Dict[str, Any]:
+    """Read back the pragma values SQLite is actually using"""
+    with db_connection() as conn:
+        settings = {"profile": DB_PRAGMA_PROFILE}
+        for name in ("journal_mode", "busy_timeout", "synchronous", "mmap_size", "cache_size", "temp_store"):
+            settings[name] = conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    # SQLite reports these two as numbers
+    settings["synchronous"] = ["OFF", "NORMAL", "FULL", "EXTRA"][settings["synchronous"]]
+    settings["temp_store"] = ["DEFAULT", "FILE", "MEMORY"][settings["temp_store"]]
+    return settings
+
+
+def check_pragmas() -> Dict[str, Any]:
+    """Report effective connection settings and warn when SQLite ignored one"""
+    settings = get_effective_pragmas()
+    print(f"[database] connection settings: {settings}")
+
+    requested = str(DB_PRAGMAS.get("journal_mode", "")).lower()
+    if requested and settings["journal_mode"] != requested:
+        print(
+            f"[database] WARNING: journal_mode is {settings['journal_mode']}, "
+            f"requested {requested}"
         )
+    return settings
+
 
-    conn.commit()
-    conn.close()
+def get_db_connection() -> PooledConnection:
+    """Get a pooled database connection; close() returns it to the pool"""
+    return get_pool().acquire()
 
 
-def set_admission_id_start(start=10001):
+# Connection of the unit of work open in this context, if any
+current_unit_of_work: ContextVar[Optional[PooledConnection]] = ContextVar("unit_of_work", default=None)
+_savepoint_ids = itertools.count(1)
+
+
+@contextmanager
+def _join_unit_of_work(conn: PooledConnection) -> Iterator[PooledConnection]:
+    """Run a write block inside the open unit of work, as a savepoint.
+
+    The transaction starts at the first write, so reads and file work
+    done earlier in the unit do not hold the write lock.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    savepoint = f"sp_{next(_savepoint_ids)}"
+    conn.execute(f"SAVEPOINT {savepoint}")
+    try:
+        yield conn
+    except BaseException:
+        # Undo just this block; the unit decides whether the rest commits
+        conn.execute(f"ROLLBACK TO {savepoint}")
+        conn.execute(f"RELEASE {savepoint}")
+        raise
+    conn.execute(f"RELEASE {savepoint}")
+
+
+@contextmanager
+def db_connection() -> Iterator[PooledConnection]:
+    """Check out a pooled connection for the duration of a block.
+
+    Commits when the block succeeds, rolls back when it raises, and
+    returns the connection to the pool either way. Inside unit_of_work()
+    the block joins the unit's transaction instead.
+    """
+    uow = current_unit_of_work.get()
+    if uow is not None:
+        with _join_unit_of_work(uow) as conn:
+            yield conn
+        return
+
     conn = get_db_connection()
-    cursor = conn.cursor()
-    # Only set if table exists and uses AUTOINCREMENT
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='student_admissions'")
-    if cursor.fetchone():
-        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name='student_admissions'")
-        row = cursor.fetchone()
-        if not row or row[0] < start - 1:
-            cursor.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'student_admissions'", (start - 1,))
+    try:
+        yield conn
+        if conn.in_transaction:
             conn.commit()
-    conn.close()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
-def init_attendance_table():
-    """Initialize the attendance table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS attendance (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            batch_timing TEXT NOT NULL,
-            status TEXT NOT NULL CHECK(status IN ('PRESENT', 'ABSENT')),
-            marked_by TEXT DEFAULT 'System User',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(student_id, date),
-            FOREIGN KEY (student_id) REFERENCES student_admissions (id) ON DELETE CASCADE
-        )
-        """
-    )
+@contextmanager
+def read_connection() -> Iterator[PooledConnection]:
+    """Check out a read-only connection for the duration of a block.
 
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_attendance_date_batch ON attendance(date, batch_timing)
-        """
-    )
+    For repository methods that only SELECT; writes through it raise
+    sqlite3.OperationalError. Inside unit_of_work() reads use the unit's
+    connection so they see its uncommitted writes.
+    """
+    uow = current_unit_of_work.get()
+    if uow is not None:
+        yield uow
+        return
 
-    conn.commit()
-    conn.close()
+    conn = get_read_pool().acquire()
+    try:
+        yield conn
+    finally:
+        conn.close()
 
 
-def init_documents_table():
-    """Initialize the student_documents table"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS student_documents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            document_type TEXT NOT NULL CHECK(document_type IN (
-                'SIGNED_ADMISSION_FORM', 'IDENTITY_PROOF', 'ADDRESS_PROOF',
-                'EDUCATIONAL_CERTIFICATE', 'FINAL_CERTIFICATE', 'OTHER'
-            )),
-            filename TEXT NOT NULL,
-            original_filename TEXT NOT NULL,
-            file_size INTEGER NOT NULL,
-            mime_type TEXT NOT NULL,
-            status TEXT NOT NULL DEFAULT 'UPLOADED' CHECK(status IN ('UPLOADED', 'PENDING', 'REJECTED')),
-            notes TEXT DEFAULT '',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (student_id) REFERENCES student_admissions (id) ON DELETE CASCADE
-        )
-        """
-    )
-
-    # Create trigger to update updated_at timestamp
-    cursor.execute(
-        """
-        CREATE TRIGGER IF NOT EXISTS update_documents_timestamp
-        AFTER UPDATE ON student_documents
-        BEGIN
-            UPDATE student_documents SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
-        END;
-        """
-    )
-
-    # Create indexes for better query performance
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_documents_student_id ON student_documents(student_id);
-        """
-    )
-
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_documents_type ON student_documents(document_type);
-        """
-    )
-
-    cursor.execute(
-        """
-        CREATE INDEX IF NOT EXISTS idx_documents_status ON student_documents(status);
-        """
-    )
-
-    conn.commit()
-    conn.close()
-
-
-def init_users_table():
-    """Initialize the users table"""
+def after_commit(callback: Callable[[], None]) -> None:
+    """Run `callback` once the caller's writes are committed.
+
+    Outside a unit of work db_connection() has already committed, so it
+    runs straight away; call it after the block. Inside one (including a
+    write queue batch) it runs when the unit commits, and is dropped if
+    the unit rolls back.
+    """
+    uow = current_unit_of_work.get()
+    if uow is None:
+        callback()
+    else:
+        uow.commit_callbacks.append(callback)
+
+
+def run_commit_callbacks(conn: PooledConnection, committed: bool) -> None:
+    """Run (or, after a rollback, drop) the callbacks queued on a unit of work"""
+    callbacks, conn.commit_callbacks = conn.commit_callbacks, []
+    if committed:
+        for callback in callbacks:
+            callback()
+
+
+def end_unit_of_work(conn: PooledConnection, commit: bool) -> None:
+    """Commit or roll back a unit of work and return its connection"""
+    committed = False
+    try:
+        if conn.in_transaction:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+        committed = commit
+    finally:
+        run_commit_callbacks(conn, committed)
+        conn.close()
+
+
+@contextmanager
+def unit_of_work() -> Iterator[PooledConnection]:
+    """Share one connection and one commit across several repository calls.
+
+        with unit_of_work():
+            student = AdmissionRepository.get_by_id(student_id)
+            DocumentsRepository.create_document(document_data)
+
+    Repository methods called inside the block join it; everything they
+    write commits together when the block exits, or not at all if it
+    raises. Nested units join the outer one.
+    """
+    if current_unit_of_work.get() is not None:
+        with db_connection() as conn:
+            yield conn
+        return
+
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            hashed_password TEXT NOT NULL,
-            role TEXT NOT NULL CHECK(role IN ('staff', 'admin'))
-        )
-        """
-    )
-    conn.commit()
-    conn.close()
+    token = current_unit_of_work.set(conn)
+    try:
+        yield conn
+    except BaseException:
+        current_unit_of_work.reset(token)
+        end_unit_of_work(conn, commit=False)
+        raise
+    current_unit_of_work.reset(token)
+    end_unit_of_work(conn, commit=True)
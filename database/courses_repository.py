@@ -1,97 +1,119 @@
 import sqlite3
-from typing import Any, Dict, List, Optional
+import threading
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
 
+from config import COURSE_CACHE_CHECK_SECONDS
 from models import Course, CourseUpdate
 
-from .connection import get_db_connection
+from .connection import after_commit, db_connection, read_connection
+from .mapping import RowMapper
+from .table_versions import TableVersionRepository
+
+COURSE = RowMapper(
+    [
+        ("id", "id"),
+        ("course_name", "courseName"),
+        ("fees", "fees"),
+        ("created_at", "createdAt"),
+        ("updated_at", "updatedAt"),
+    ]
+)
+
+
+class CourseSnapshot:
+    """One load of the courses table, indexed for lookups"""
+
+    __slots__ = ("version", "courses", "by_id", "names")
+
+    def __init__(self, version: int, courses: List[Dict[str, Any]]):
+        self.version = version
+        self.courses: Tuple[Dict[str, Any], ...] = tuple(courses)
+        self.by_id = {course["id"]: course for course in self.courses}
+        # Lowercased names in catalog order, for substring search
+        self.names = tuple(course["courseName"].lower() for course in self.courses)
+
+
+class CourseCatalog:
+    """In-process cache of the courses table.
+
+    CourseRepository writes invalidate it once they commit, so a load
+    racing the write cannot cache the old rows. Writes from other
+    workers are noticed through the courses counter in table_versions,
+    read at most once per `check_interval` seconds; between checks,
+    lookups never touch SQLite.
+    """
+
+    def __init__(self, check_interval: float = COURSE_CACHE_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._snapshot: Optional[CourseSnapshot] = None
+        self._checked_at = 0.0
+        # Bumped by invalidate() so a load racing a write is not kept
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def snapshot(self) -> CourseSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            generation = self._generation
+            snapshot = self._snapshot
+        # Version first: rows read afterwards are at least that new
+        version = TableVersionRepository.get(("courses",))["courses"]
+        if snapshot is None or snapshot.version != version:
+            with read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT {COURSE.columns} FROM courses ORDER BY course_name ASC")
+                snapshot = CourseSnapshot(version, COURSE.all(cursor))
+
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._checked_at = monotonic()
+        return snapshot
+
+
+course_catalog = CourseCatalog()
 
 
 class CourseRepository:
     @staticmethod
     def create(course: Course) -> int:
         """Create a new course and return its ID"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                "INSERT INTO courses (course_name, fees) VALUES (?, ?)",
-                (course.courseName, course.fees),
-            )
-            course_id = cursor.lastrowid
-            conn.commit()
-            return course_id
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO courses (course_name, fees) VALUES (?, ?)",
+                    (course.courseName, course.fees),
+                )
+                course_id = cursor.lastrowid
         except sqlite3.IntegrityError:
             raise ValueError(f"Course '{course.courseName}' already exists")
-        finally:
-            conn.close()
+        after_commit(course_catalog.invalidate)
+        return course_id
 
     @staticmethod
     def get_all() -> List[Dict[str, Any]]:
         """Get all courses"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, course_name, fees, created_at, updated_at
-            FROM courses
-            ORDER BY course_name ASC
-            """
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        courses = []
-        for row in rows:
-            courses.append(
-                {
-                    "id": row[0],
-                    "courseName": row[1],
-                    "fees": row[2],
-                    "createdAt": row[3],
-                    "updatedAt": row[4],
-                }
-            )
-
-        return courses
+        return [dict(course) for course in course_catalog.snapshot().courses]
 
     @staticmethod
     def get_by_id(course_id: int) -> Optional[Dict[str, Any]]:
         """Get course by ID"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, course_name, fees, created_at, updated_at
-            FROM courses
-            WHERE id = ?
-            """,
-            (course_id,),
-        )
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if not row:
-            return None
-
-        return {
-            "id": row[0],
-            "courseName": row[1],
-            "fees": row[2],
-            "createdAt": row[3],
-            "updatedAt": row[4],
-        }
+        course = course_catalog.snapshot().by_id.get(course_id)
+        return dict(course) if course else None
 
     @staticmethod
     def update(course_id: int, course_update: CourseUpdate) -> bool:
         """Update a course"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         # Build dynamic query based on provided fields
         update_fields = []
         update_values = []
@@ -105,64 +127,40 @@ class CourseRepository:
             update_values.append(course_update.fees)
 
         if not update_fields:
-            conn.close()
             return False
 
         update_values.append(course_id)
         query = f"UPDATE courses SET {', '.join(update_fields)} WHERE id = ?"
 
         try:
-            cursor.execute(query, update_values)
-            rows_affected = cursor.rowcount
-            conn.commit()
-            return rows_affected > 0
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, update_values)
+                rows_affected = cursor.rowcount
         except sqlite3.IntegrityError:
             raise ValueError("Course name already exists")
-        finally:
-            conn.close()
+        after_commit(course_catalog.invalidate)
+        return rows_affected > 0
 
     @staticmethod
     def delete(course_id: int) -> bool:
         """Delete a course"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("DELETE FROM courses WHERE id = ?", (course_id,))
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+            cursor.execute("DELETE FROM courses WHERE id = ?", (course_id,))
+            rows_affected = cursor.rowcount
 
+        after_commit(course_catalog.invalidate)
         return rows_affected > 0
 
     @staticmethod
     def search(search_term: str) -> List[Dict[str, Any]]:
-        """Search courses by name"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, course_name, fees, created_at, updated_at
-            FROM courses
-            WHERE course_name LIKE ?
-            ORDER BY course_name ASC
-            """,
-            (f"%{search_term}%",),
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        courses = []
-        for row in rows:
-            courses.append(
-                {
-                    "id": row[0],
-                    "courseName": row[1],
-                    "fees": row[2],
-                    "createdAt": row[3],
-                    "updatedAt": row[4],
-                }
-            )
-
-        return courses
+        """Search courses by name (case-insensitive substring, like LIKE '%term%')"""
+        snapshot = course_catalog.snapshot()
+        term = search_term.lower()
+        return [
+            dict(course)
+            for course, name in zip(snapshot.courses, snapshot.names)
+            if term in name
+        ]
@@ -1,19 +1,75 @@
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from models import StudentEnquiry
 
-from .connection import get_db_connection
+from .connection import db_connection, read_connection
+from .mapping import RowMapper
+from .pagination import decode_cursor, keyset_page, page_size
+
+ENQUIRY = RowMapper(
+    [
+        ("id", "id"),
+        ("first_name", "firstName"),
+        ("middle_name", "middleName"),
+        ("last_name", "lastName"),
+        ("date_of_birth", "dateOfBirth"),
+        ("gender", "gender"),
+        ("marital_status", "maritalStatus"),
+        ("mother_tongue", "motherTongue"),
+        ("aadhar_number", "aadharNumber"),
+        ("correspondence_address", "correspondenceAddress"),
+        ("city", "city"),
+        ("state", "state"),
+        ("district", "district"),
+        ("mobile_number", "mobileNumber"),
+        ("alternate_mobile_number", "alternateMobileNumber"),
+        ("category", "category"),
+        ("educational_qualification", "educationalQualification"),
+        ("course_name", "courseName"),
+        ("timing", "timing"),
+        ("handled_by", "handledBy"),
+        ("created_at", "createdAt"),
+    ]
+)
+
+
+def _list_filters(
+    course_name: Optional[str],
+    timing: Optional[str],
+    handled_by: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+) -> Tuple[List[str], List[Any]]:
+    """WHERE conditions and parameters shared by get_page and count"""
+    conditions = []
+    params: List[Any] = []
+
+    if course_name:
+        conditions.append("course_name = ?")
+        params.append(course_name)
+    if timing:
+        conditions.append("timing = ?")
+        params.append(timing)
+    if handled_by:
+        conditions.append("handled_by = ?")
+        params.append(handled_by)
+    if date_from:
+        conditions.append("created_at >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append("created_at < date(?, '+1 day')")
+        params.append(date_to.isoformat())
+    return conditions, params
 
 
 class EnquiryRepository:
     @staticmethod
     def create(enquiry: StudentEnquiry) -> int:
         """Create a new enquiry and return its ID"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
 
-        try:
             cursor.execute(
                 """
                 INSERT INTO student_enquiries (
@@ -66,108 +122,92 @@ class EnquiryRepository:
                 ),
             )
 
-            conn.commit()
             return enquiry_id
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
 
     @staticmethod
     def get_all() -> List[Dict[str, Any]]:
         """Get all enquiries"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, first_name, middle_name, last_name, date_of_birth, gender,
-                   marital_status, mother_tongue, aadhar_number, correspondence_address,
-                   city, state, district, mobile_number, alternate_mobile_number,
-                   category, educational_qualification, course_name, timing, handled_by, created_at
-            FROM student_enquiries
-            ORDER BY created_at DESC
-            """
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        enquiries = []
-        for row in rows:
-            enquiries.append(
-                {
-                    "id": row[0],
-                    "firstName": row[1],
-                    "middleName": row[2],
-                    "lastName": row[3],
-                    "dateOfBirth": row[4],
-                    "gender": row[5],
-                    "maritalStatus": row[6],
-                    "motherTongue": row[7],
-                    "aadharNumber": row[8],
-                    "correspondenceAddress": row[9],
-                    "city": row[10],
-                    "state": row[11],
-                    "district": row[12],
-                    "mobileNumber": row[13],
-                    "alternateMobileNumber": row[14],
-                    "category": row[15],
-                    "educationalQualification": row[16],
-                    "courseName": row[17],
-                    "timing": row[18],
-                    "handledBy": row[19],
-                    "createdAt": row[20],
-                }
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {ENQUIRY.columns}
+                FROM student_enquiries
+                ORDER BY created_at DESC
+                """
+            )
+
+            return ENQUIRY.all(cursor)
+
+    @staticmethod
+    def get_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        course_name: Optional[str] = None,
+        timing: Optional[str] = None,
+        handled_by: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of enquiries, newest first, and the cursor for the next.
+
+        Pages are keyed on (created_at, id) rather than OFFSET, so every
+        page is an index range scan no matter how deep it is. `fields`
+        limits the response keys; id and createdAt are always included.
+        """
+        mapper = ENQUIRY.subset(fields, required=("id", "createdAt")) if fields else ENQUIRY
+        limit = page_size(limit)
+        conditions, params = _list_filters(course_name, timing, handled_by, date_from, date_to)
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor, 2))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            rows = mapper.all(
+                conn.execute(
+                    f"""
+                    SELECT {mapper.columns}
+                    FROM student_enquiries
+                    {where}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                    """,
+                    (*params, limit + 1),
+                )
             )
 
-        return enquiries
+        return keyset_page(rows, limit, ("createdAt", "id"))
+
+    @staticmethod
+    def count(
+        course_name: Optional[str] = None,
+        timing: Optional[str] = None,
+        handled_by: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> int:
+        """Number of enquiries matching the get_page filters, across all pages"""
+        conditions, params = _list_filters(course_name, timing, handled_by, date_from, date_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM student_enquiries {where}", params).fetchone()[0]
 
     @staticmethod
     def get_by_id(enquiry_id: int) -> Optional[Dict[str, Any]]:
         """Get enquiry by ID"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, first_name, middle_name, last_name, date_of_birth, gender,
-                   marital_status, mother_tongue, aadhar_number, correspondence_address,
-                   city, state, district, mobile_number, alternate_mobile_number,
-                   category, educational_qualification, course_name, timing, handled_by, created_at
-            FROM student_enquiries
-            WHERE id = ?
-            """,
-            (enquiry_id,),
-        )
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if not row:
-            return None
-
-        return {
-            "id": row[0],
-            "firstName": row[1],
-            "middleName": row[2],
-            "lastName": row[3],
-            "dateOfBirth": row[4],
-            "gender": row[5],
-            "maritalStatus": row[6],
-            "motherTongue": row[7],
-            "aadharNumber": row[8],
-            "correspondenceAddress": row[9],
-            "city": row[10],
-            "state": row[11],
-            "district": row[12],
-            "mobileNumber": row[13],
-            "alternateMobileNumber": row[14],
-            "category": row[15],
-            "educationalQualification": row[16],
-            "courseName": row[17],
-            "timing": row[18],
-            "handledBy": row[19],
-            "createdAt": row[20],
-        }
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {ENQUIRY.columns}
+                FROM student_enquiries
+                WHERE id = ?
+                """,
+                (enquiry_id,),
+            )
+
+            return ENQUIRY.one(cursor.fetchone())
@@ -0,0 +1,51 @@
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .admission_repository import ADMISSION_DETAIL
+from .connection import read_connection
+from .enquiry_repository import ENQUIRY
+from .fees_repository import PAYMENT_WITH_STUDENT
+from .mapping import RowMapper
+
+# Rows fetched (and streamed) per round trip
+EXPORT_CHUNK_SIZE = 1000
+
+# entity -> (mapper, FROM clause, ORDER BY)
+EXPORTS: Dict[str, Tuple[RowMapper, str, str]] = {
+    "enquiries": (ENQUIRY, "student_enquiries", "id"),
+    # Learner portal passwords stay out of exports
+    "admissions": (
+        ADMISSION_DETAIL.subset(key for key in ADMISSION_DETAIL.keys if key != "era_password"),
+        "student_admissions",
+        "id",
+    ),
+    "payments": (
+        PAYMENT_WITH_STUDENT,
+        "fee_payments fp JOIN student_admissions sa ON fp.student_id = sa.id",
+        "fp.id",
+    ),
+}
+
+
+class ExportRepository:
+    @staticmethod
+    def columns(entity: str) -> Tuple[str, ...]:
+        """Response keys of an export, in column order"""
+        return EXPORTS[entity][0].keys
+
+    @staticmethod
+    def iter_chunks(entity: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """Yield a whole table as lists of row dicts, chunk_size rows at a time.
+
+        Only one chunk is in memory at once. The read connection is held
+        until the generator finishes or is closed, and the single SELECT
+        reads one consistent snapshot under WAL without blocking writers.
+        """
+        mapper, source, order_by = EXPORTS[entity]
+        with read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {mapper.columns} FROM {source} ORDER BY {order_by}")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield mapper.all(rows)
@@ -0,0 +1,252 @@
+"""Per-admission fee balances kept in student_fee_balances.
+
+The table is a read model over student_admissions, courses and
+fee_payments. Triggers from migration 9 update a student's row in the
+same transaction as every write that changes it, so fee summaries and
+per-student lookups read one indexed row instead of summing payments.
+
+Each row also carries its fee status (migration 10). Triggers re-evaluate
+it when the row's balance changes; FeeStatusRefresher re-evaluates every
+row once a day, when months overdue and late fees move on by the calendar.
+
+Check or repair the table from the project root:
+    python -m database.fee_balances verify
+    python -m database.fee_balances rebuild
+"""
+import argparse
+import os
+import sys
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from config import LATE_FEE_PER_MONTH
+from .connection import db_connection, read_connection, unit_of_work
+
+# Used when a student's course is missing from the catalog
+DEFAULT_COURSE_FEE = 2000
+
+BALANCE_COLUMNS = ("course_fee", "total_paid", "total_discount", "late_fee")
+
+# Every admission's balance worked out from scratch; the triggers keep
+# student_fee_balances equal to this
+COMPUTED_FEE_BALANCES_SQL = f"""
+    SELECT
+        sa.id AS student_id,
+        sa.created_at AS admission_date,
+        COALESCE(c.fees, {DEFAULT_COURSE_FEE}) AS course_fee,
+        COALESCE(t.paid, 0) AS total_paid,
+        COALESCE(t.discount, 0) AS total_discount,
+        COALESCE(t.late_fee, 0) AS late_fee
+    FROM student_admissions sa
+    LEFT JOIN courses c ON sa.course_name = c.course_name
+    LEFT JOIN (
+        SELECT student_id, SUM(amount) AS paid, SUM(discount) AS discount, SUM(late_fee) AS late_fee
+        FROM fee_payments
+        GROUP BY student_id
+    ) t ON t.student_id = sa.id
+"""
+
+# Status of a student_fee_balances row in the month `{month}` (an SQL
+# expression for year * 12 + month). A balance is OVERDUE once the
+# admission month is behind that month.
+_MONTHS_SINCE_ADMISSION = (
+    "({month} - (CAST(strftime('%Y', admission_date) AS INTEGER) * 12"
+    " + CAST(strftime('%m', admission_date) AS INTEGER)))"
+)
+OVERDUE_SQL = f"balance > 0 AND {_MONTHS_SINCE_ADMISSION} > 0"
+FEE_STATUS_SQL = f"""CASE
+                WHEN balance <= 0 THEN 'PAID'
+                WHEN {_MONTHS_SINCE_ADMISSION} > 0 THEN 'OVERDUE'
+                WHEN total_paid > 0 OR total_discount > 0 THEN 'PARTIAL'
+                ELSE 'PENDING'
+            END"""
+MONTHS_OVERDUE_SQL = f"CASE WHEN {OVERDUE_SQL} THEN {_MONTHS_SINCE_ADMISSION} ELSE 0 END"
+# {late_fee} is the accrual for one month overdue
+LATE_FEE_ACCRUED_SQL = f"CASE WHEN {OVERDUE_SQL} THEN {_MONTHS_SINCE_ADMISSION} * {{late_fee}} ELSE 0 END"
+
+# The current month by SQLite's clock, for triggers
+CURRENT_MONTH_SQL = (
+    "(CAST(strftime('%Y', 'now', 'localtime') AS INTEGER) * 12"
+    " + CAST(strftime('%m', 'now', 'localtime') AS INTEGER))"
+)
+
+# Sums kept incrementally can differ from a fresh SUM in the last bits
+_TOLERANCE = 1e-6
+
+
+def current_month(today: Optional[date] = None) -> int:
+    """year * 12 + month, the month number the status SQL compares against"""
+    today = today or date.today()
+    return today.year * 12 + today.month
+
+
+class FeeBalanceRepository:
+    @staticmethod
+    def rebuild() -> int:
+        """Recompute every row of student_fee_balances and return the row count"""
+        columns = ", ".join(("admission_date",) + BALANCE_COLUMNS)
+        with unit_of_work(), db_connection() as conn:
+            conn.execute("DELETE FROM student_fee_balances")
+            cursor = conn.execute(
+                f"""
+                INSERT INTO student_fee_balances (student_id, {columns})
+                SELECT student_id, {columns}
+                FROM ({COMPUTED_FEE_BALANCES_SQL})
+                """
+            )
+            # The insert trigger sets each status; late fees accrue here
+            FeeBalanceRepository.refresh_status()
+            return cursor.rowcount
+
+    @staticmethod
+    def refresh_status(today: Optional[date] = None, late_fee_per_month: float = LATE_FEE_PER_MONTH) -> int:
+        """Re-evaluate every row's status, months overdue and accrued late fee.
+
+        Only rows whose values change are written, so running it again
+        the same day (from another worker, say) costs one scan. Returns
+        the number of rows updated.
+        """
+        month = str(current_month(today))
+        status = FEE_STATUS_SQL.format(month=month)
+        months_overdue = MONTHS_OVERDUE_SQL.format(month=month)
+        late_fee_accrued = LATE_FEE_ACCRUED_SQL.format(month=month, late_fee=":late_fee")
+        with db_connection() as conn:
+            cursor = conn.execute(
+                f"""
+                UPDATE student_fee_balances SET
+                    status = {status},
+                    months_overdue = {months_overdue},
+                    late_fee_accrued = {late_fee_accrued}
+                WHERE status IS NOT {status}
+                   OR months_overdue IS NOT {months_overdue}
+                   OR late_fee_accrued IS NOT {late_fee_accrued}
+                """,
+                {"late_fee": late_fee_per_month},
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def verify() -> List[Dict[str, Any]]:
+        """Rows of student_fee_balances that disagree with a fresh computation.
+
+        Each problem names the student and gives the stored and expected
+        values (None for a missing or orphaned row).
+        """
+        columns = ("admission_date",) + BALANCE_COLUMNS
+        mismatch = " OR ".join(
+            ["b.admission_date IS NOT e.admission_date"]
+            + [f"ABS(b.{column} - e.{column}) > {_TOLERANCE}" for column in BALANCE_COLUMNS]
+        )
+        stored = ", ".join(f"b.{column}" for column in columns)
+        expected = ", ".join(f"e.{column}" for column in columns)
+        with read_connection() as conn:
+            rows = conn.execute(
+                f"""
+                WITH expected AS ({COMPUTED_FEE_BALANCES_SQL})
+                SELECT e.student_id, b.student_id IS NOT NULL, {stored}, TRUE, {expected}
+                FROM expected e
+                LEFT JOIN student_fee_balances b ON b.student_id = e.student_id
+                WHERE b.student_id IS NULL OR {mismatch}
+                UNION ALL
+                SELECT b.student_id, TRUE, {stored}, FALSE, {', '.join('NULL' for _ in columns)}
+                FROM student_fee_balances b
+                WHERE b.student_id NOT IN (SELECT id FROM student_admissions)
+                ORDER BY 1
+                """
+            ).fetchall()
+
+        width = len(columns)
+        return [
+            {
+                "student_id": row[0],
+                "stored": dict(zip(columns, row[2:2 + width])) if row[1] else None,
+                "expected": dict(zip(columns, row[3 + width:])) if row[2 + width] else None,
+            }
+            for row in rows
+        ]
+
+
+class FeeStatusRefresher:
+    """Background thread that runs FeeBalanceRepository.refresh_status daily.
+
+    It refreshes once on start and again after each local midnight,
+    through the write queue so the update shares the writer's
+    transactions. A failed refresh is retried after `retry_seconds`.
+    """
+
+    def __init__(self, retry_seconds: float = 60):
+        self.retry_seconds = retry_seconds
+        self.pid = os.getpid()
+        self.last_refreshed: Optional[date] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fee-status", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _seconds_until_tomorrow(self) -> float:
+        midnight = datetime.combine(date.today() + timedelta(days=1), time.min)
+        return max((midnight - datetime.now()).total_seconds(), 1)
+
+    def _run(self) -> None:
+        from .writer import write
+
+        while not self._stop.is_set():
+            today = date.today()
+            if self.last_refreshed != today:
+                try:
+                    updated = write(FeeBalanceRepository.refresh_status, today)
+                except Exception as e:
+                    print(f"[database] fee status refresh failed: {e}")
+                    self._stop.wait(self.retry_seconds)
+                    continue
+                self.last_refreshed = today
+                print(f"[database] refreshed fee status for {today} ({updated} rows changed)")
+            self._stop.wait(self._seconds_until_tomorrow())
+
+
+_refresher: Optional[FeeStatusRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def start_fee_status_refresher() -> FeeStatusRefresher:
+    """Start this process's refresher, unless it is already running"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None or _refresher.pid != os.getpid():
+            _refresher = FeeStatusRefresher()
+        return _refresher
+
+
+def stop_fee_status_refresher() -> None:
+    global _refresher
+    with _refresher_lock:
+        if _refresher is not None and _refresher.pid == os.getpid():
+            _refresher.stop()
+        _refresher = None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m database.fee_balances", description=__doc__.split("\n")[0])
+    parser.add_argument("command", choices=("verify", "rebuild"))
+    args = parser.parse_args(argv)
+
+    from .migrations import migrate
+
+    migrate()
+    if args.command == "rebuild":
+        print(f"Rebuilt {FeeBalanceRepository.rebuild()} fee balances")
+        return 0
+
+    problems = FeeBalanceRepository.verify()
+    for problem in problems:
+        print(f"student {problem['student_id']}: stored {problem['stored']}, expected {problem['expected']}")
+    print(f"{len(problems)} fee balance(s) out of date" if problems else "Fee balances are up to date")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
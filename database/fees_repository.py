@@ -1,299 +1,526 @@
 import sqlite3
 import json
-from typing import Any, Dict, List, Optional
-from datetime import datetime
-from .connection import get_db_connection
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import date
+from .connection import db_connection, read_connection
+from .mapping import RowMapper, full_name, json_list
+from .pagination import decode_cursor, keyset_page, page_size
+
+PAYMENT_HISTORY_FIELDS = [
+    ("fp.id", "id"),
+    ("fp.amount", "amount"),
+    ("fp.payment_date", "payment_date"),
+    ("fp.payment_method", "payment_method"),
+    ("fp.transaction_id", "transaction_id"),
+    ("fp.notes", "notes"),
+    ("fp.late_fee", "late_fee"),
+    ("fp.discount", "discount"),
+    ("fp.handled_by", "handled_by"),
+    ("fp.created_at", "created_at"),
+]
+
+PAYMENT_FIELDS = [
+    ("fp.id", "id"),
+    ("fp.student_id", "student_id"),
+    ("fp.amount", "amount"),
+    ("fp.payment_date", "payment_date"),
+    ("fp.payment_method", "payment_method"),
+    ("fp.transaction_id", "transaction_id"),
+    ("fp.notes", "notes"),
+    ("fp.late_fee", "late_fee"),
+    ("fp.discount", "discount"),
+    ("fp.handled_by", "handled_by"),
+    ("fp.created_at", "created_at"),
+    ("fp.denominations", "denominations"),
+    ("fp.cheque_number", "cheque_number"),
+    ("fp.bank_name", "bank_name"),
+]
+
+PAYMENT_HISTORY = RowMapper(PAYMENT_HISTORY_FIELDS)
+
+PAYMENT = RowMapper(PAYMENT_FIELDS, converters={"denominations": json_list})
+
+PAYMENT_WITH_STUDENT_FIELDS = PAYMENT_FIELDS + [
+    (full_name("sa"), "student_name"),
+    ("sa.mobile_number", "mobile_number"),
+    ("sa.course_name", "course_name"),
+]
+
+PAYMENT_WITH_STUDENT = RowMapper(
+    PAYMENT_WITH_STUDENT_FIELDS, converters={"denominations": json_list}
+)
+
+# Ledger rows skip the denominations JSON unless it is asked for
+PAYMENT_LEDGER = RowMapper(
+    [field for field in PAYMENT_WITH_STUDENT_FIELDS if field[1] != "denominations"]
+)
+
+
+FEE_SUMMARY = RowMapper(
+    [
+        ("b.student_id", "student_id"),
+        (full_name("sa"), "student_name"),
+        ("sa.mobile_number", "mobile_number"),
+        ("sa.course_name", "course_name"),
+        ("b.admission_date", "admission_date"),
+        ("b.course_fee", "course_fee"),
+        ("b.total_paid", "total_paid"),
+        ("b.total_discount", "total_discount"),
+        ("b.balance", "balance"),
+        ("b.status", "status"),
+        ("b.status = 'OVERDUE'", "is_overdue"),
+        ("b.months_overdue", "months_overdue"),
+        ("b.late_fee_accrued", "late_fee_accrued"),
+    ],
+    converters={"is_overdue": bool},
+)
+
+# Balances and statuses are stored in student_fee_balances (see
+# database/fee_balances.py); pages walk its indexes
+FEE_SUMMARY_SQL = f"""
+    SELECT {FEE_SUMMARY.columns}
+    FROM student_fee_balances b
+    JOIN student_admissions sa ON sa.id = b.student_id
+"""
+
+
+# Characters of a date that name its period in fee_collections
+COLLECTION_PERIODS = {"day": 10, "month": 7}
+
+COLLECTION_TOTALS = ("payment_count", "amount", "discount", "late_fee")
+
+
+def _sum_collections(parts: Iterable[List[Any]]) -> Dict[str, Any]:
+    """Totals dict for [count, amount, discount, late_fee] accumulators"""
+    sums = [0, 0, 0, 0]
+    for count, amount, discount, late_fee in parts:
+        sums[0] += count
+        sums[1] += amount
+        sums[2] += discount
+        sums[3] += late_fee
+    return dict(zip(COLLECTION_TOTALS, sums))
+
+
+def _collection_period(
+    period: str, by_method: Dict[str, List[Any]], by_handler: Dict[str, List[Any]]
+) -> Dict[str, Any]:
+    return {
+        "period": period,
+        **_sum_collections(by_method.values()),
+        "by_payment_method": {method: dict(zip(COLLECTION_TOTALS, parts)) for method, parts in by_method.items()},
+        "by_handled_by": {handler: dict(zip(COLLECTION_TOTALS, parts)) for handler, parts in by_handler.items()},
+    }
+
+
+PAYMENT_INSERT_SQL = """
+    INSERT INTO fee_payments (
+        student_id, amount, payment_date, payment_method,
+        transaction_id, notes, late_fee, discount, handled_by,
+        denominations, cheque_number, bank_name
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _payment_values(payment_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """PAYMENT_INSERT_SQL parameters for one payment"""
+    denominations = payment_data.get("denominations")
+    return (
+        payment_data["student_id"],
+        payment_data["amount"],
+        payment_data["payment_date"],
+        payment_data["payment_method"],
+        payment_data.get("transaction_id", ""),
+        payment_data.get("notes", ""),
+        payment_data.get("late_fee", 0),
+        payment_data.get("discount", 0),
+        payment_data.get("handled_by", "System User"),
+        json.dumps(denominations) if denominations else None,
+        payment_data.get("cheque_number", ""),
+        payment_data.get("bank_name", ""),
+    )
+
+
+def _payment_filters(
+    date_from: Optional[date],
+    date_to: Optional[date],
+    payment_method: Optional[str],
+    handled_by: Optional[str],
+) -> Tuple[List[str], List[Any]]:
+    """WHERE conditions and parameters shared by get_payments_page and count_payments"""
+    conditions = []
+    params: List[Any] = []
+
+    if date_from:
+        conditions.append("fp.payment_date >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append("fp.payment_date < date(?, '+1 day')")
+        params.append(date_to.isoformat())
+    if payment_method:
+        conditions.append("fp.payment_method = ?")
+        params.append(payment_method)
+    if handled_by:
+        conditions.append("fp.handled_by = ?")
+        params.append(handled_by)
+    return conditions, params
 
 
 class FeesRepository:
     @staticmethod
     def create_payment(payment_data: Dict[str, Any]) -> int:
         """Create a new payment record"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            denominations = payment_data.get("denominations")
-            cheque_number = payment_data.get("cheque_number", "")
-            bank_name = payment_data.get("bank_name", "")
+        with db_connection() as conn:
+            cursor = conn.execute(PAYMENT_INSERT_SQL, _payment_values(payment_data))
+            return cursor.lastrowid
+
+    @staticmethod
+    def create_payments(payments: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Insert a batch of payments with one executemany.
 
-            # Debug prints
-            print("[DEBUG] Received payment_data:", payment_data)
-            print("[DEBUG] Serialized denominations:", json.dumps(denominations) if denominations else None)
+        Payments for unknown students, and payments whose transaction_id
+        is already recorded (or repeated earlier in the batch), are
+        skipped. Returns, per payment, None if it was inserted or why it
+        was skipped. Run it through the write queue so the duplicate
+        check and the insert see the same data.
+        """
+        student_ids = list({payment["student_id"] for payment in payments})
+        transaction_ids = list({payment["transaction_id"] for payment in payments if payment.get("transaction_id")})
+        with db_connection() as conn:
+            known_students = {
+                row[0]
+                for row in conn.execute(
+                    f"SELECT id FROM student_admissions WHERE id IN ({', '.join('?' * len(student_ids))})",
+                    student_ids,
+                )
+            }
+            recorded = set()
+            if transaction_ids:
+                recorded = {
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT transaction_id FROM fee_payments "
+                        f"WHERE transaction_id IN ({', '.join('?' * len(transaction_ids))}) AND transaction_id <> ''",
+                        transaction_ids,
+                    )
+                }
+
+            skipped: List[Optional[str]] = []
+            rows = []
+            for payment in payments:
+                transaction_id = payment.get("transaction_id")
+                if payment["student_id"] not in known_students:
+                    skipped.append(f"Student {payment['student_id']} not found")
+                elif transaction_id and transaction_id in recorded:
+                    skipped.append(f"Duplicate transaction_id '{transaction_id}'")
+                else:
+                    skipped.append(None)
+                    rows.append(_payment_values(payment))
+                    if transaction_id:
+                        recorded.add(transaction_id)
+
+            conn.executemany(PAYMENT_INSERT_SQL, rows)
+            return skipped
+
+    @staticmethod
+    def get_all_payments() -> List[Dict[str, Any]]:
+        """Get all payment records with student details"""
+        with read_connection() as conn:
+            cursor = conn.cursor()
 
             cursor.execute(
+                f"""
+                SELECT {PAYMENT_WITH_STUDENT.columns}
+                FROM fee_payments fp
+                JOIN student_admissions sa ON fp.student_id = sa.id
+                ORDER BY fp.payment_date DESC
                 """
-                INSERT INTO fee_payments (
-                    student_id, amount, payment_date, payment_method,
-                    transaction_id, notes, late_fee, discount, handled_by,
-                    denominations, cheque_number, bank_name
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    payment_data["student_id"],
-                    payment_data["amount"],
-                    payment_data["payment_date"],
-                    payment_data["payment_method"],
-                    payment_data.get("transaction_id", ""),
-                    payment_data.get("notes", ""),
-                    payment_data.get("late_fee", 0),
-                    payment_data.get("discount", 0),
-                    payment_data.get("handled_by", "System User"),
-                    json.dumps(denominations) if denominations else None,
-                    cheque_number,
-                    bank_name,
-                ),
             )
 
-            payment_id = cursor.lastrowid
-            conn.commit()
-            return payment_id
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+            return PAYMENT_WITH_STUDENT.all(cursor)
 
     @staticmethod
-    def get_all_payments() -> List[Dict[str, Any]]:
-        """Get all payment records with student details"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT 
-                fp.id, fp.student_id, fp.amount, fp.payment_date,
-                fp.payment_method, fp.transaction_id, fp.notes,
-                fp.late_fee, fp.discount, fp.handled_by, fp.created_at,
-                fp.denominations, fp.cheque_number, fp.bank_name,
-                sa.first_name, sa.middle_name, sa.last_name,
-                sa.mobile_number, sa.course_name
-            FROM fee_payments fp
-            JOIN student_admissions sa ON fp.student_id = sa.id
-            ORDER BY fp.payment_date DESC
-            """
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        payments = []
-        for row in rows:
-            payments.append({
-                "id": row[0],
-                "student_id": row[1],
-                "amount": row[2],
-                "payment_date": row[3],
-                "payment_method": row[4],
-                "transaction_id": row[5],
-                "notes": row[6],
-                "late_fee": row[7],
-                "discount": row[8],
-                "handled_by": row[9],
-                "created_at": row[10],
-                "denominations": json.loads(row[11]) if row[11] else [],
-                "cheque_number": row[12],
-                "bank_name": row[13],
-                "student_name": f"{row[14]} {row[15] or ''} {row[16]}".strip(),
-                "mobile_number": row[17],
-                "course_name": row[18],
-            })
-
-        return payments
+    def get_payments_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        payment_method: Optional[str] = None,
+        handled_by: Optional[str] = None,
+        include_denominations: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of the payment ledger, latest first, and the next cursor.
+
+        Pages are keyed on (payment_date, id), which idx_fee_payments_date
+        already orders (SQLite appends the rowid to every index).
+        """
+        mapper = PAYMENT_WITH_STUDENT if include_denominations else PAYMENT_LEDGER
+        limit = page_size(limit)
+        conditions, params = _payment_filters(date_from, date_to, payment_method, handled_by)
+        if cursor:
+            conditions.append("(fp.payment_date, fp.id) < (?, ?)")
+            params.extend(decode_cursor(cursor, 2))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            rows = mapper.all(
+                conn.execute(
+                    f"""
+                    SELECT {mapper.columns}
+                    FROM fee_payments fp
+                    JOIN student_admissions sa ON fp.student_id = sa.id
+                    {where}
+                    ORDER BY fp.payment_date DESC, fp.id DESC
+                    LIMIT ?
+                    """,
+                    (*params, limit + 1),
+                )
+            )
+
+        return keyset_page(rows, limit, ("payment_date", "id"))
+
+    @staticmethod
+    def count_payments(
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        payment_method: Optional[str] = None,
+        handled_by: Optional[str] = None,
+    ) -> int:
+        """Number of ledger entries matching the get_payments_page filters"""
+        conditions, params = _payment_filters(date_from, date_to, payment_method, handled_by)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            return conn.execute(
+                f"""
+                SELECT COUNT(*)
+                FROM fee_payments fp
+                JOIN student_admissions sa ON fp.student_id = sa.id
+                {where}
+                """,
+                params,
+            ).fetchone()[0]
 
     @staticmethod
     def get_payments_by_student(student_id: int) -> List[Dict[str, Any]]:
         """Get all payments for a specific student"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT 
-                id, student_id, amount, payment_date, payment_method,
-                transaction_id, notes, late_fee, discount, handled_by, created_at,
-                denominations, cheque_number, bank_name
-            FROM fee_payments
-            WHERE student_id = ?
-            ORDER BY payment_date DESC
-            """,
-            (student_id,),
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        payments = []
-        for row in rows:
-            payments.append({
-                "id": row[0],
-                "student_id": row[1],
-                "amount": row[2],
-                "payment_date": row[3],
-                "payment_method": row[4],
-                "transaction_id": row[5],
-                "notes": row[6],
-                "late_fee": row[7],
-                "discount": row[8],
-                "handled_by": row[9],
-                "created_at": row[10],
-                "denominations": json.loads(row[11]) if row[11] else [],
-                "cheque_number": row[12],
-                "bank_name": row[13],
-            })
-
-        return payments
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {PAYMENT.columns}
+                FROM fee_payments fp
+                WHERE fp.student_id = ?
+                ORDER BY fp.payment_date DESC
+                """,
+                (student_id,),
+            )
+
+            return PAYMENT.all(cursor)
 
     @staticmethod
     def get_fee_summary() -> List[Dict[str, Any]]:
         """Get fee summary for all students with payment status"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get all students with their course fees
-        cursor.execute(
-            """
-            SELECT 
-                sa.id, sa.first_name, sa.middle_name, sa.last_name,
-                sa.mobile_number, sa.course_name, sa.created_at,
-                c.fees as course_fee
-            FROM student_admissions sa
-            LEFT JOIN courses c ON sa.course_name = c.course_name
-            ORDER BY sa.created_at DESC
-            """
-        )
-
-        students = cursor.fetchall()
-        fee_summary = []
-
-        for student in students:
-            student_id = student[0]
-            
-            # Calculate total due (course fee)
-            course_fee = student[7] or 2000  # Default fee if not found
-            
-            # Get total paid and total discount
-            cursor.execute(
-                "SELECT COALESCE(SUM(amount), 0), COALESCE(SUM(discount), 0) FROM fee_payments WHERE student_id = ?",
-                (student_id,)
+        with read_connection() as conn:
+            return FEE_SUMMARY.all(
+                conn.execute(f"{FEE_SUMMARY_SQL} ORDER BY b.admission_date DESC, b.student_id DESC")
+            )
+
+    @staticmethod
+    def get_fee_summary_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of the fee summary, latest admissions first, and the next cursor"""
+        limit = page_size(limit)
+        conditions = []
+        params: List[Any] = []
+
+        if status:
+            conditions.append("b.status = ?")
+            params.append(status)
+        if cursor:
+            conditions.append("(b.admission_date, b.student_id) < (?, ?)")
+            params.extend(decode_cursor(cursor, 2))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            rows = FEE_SUMMARY.all(
+                conn.execute(
+                    f"{FEE_SUMMARY_SQL} {where} ORDER BY b.admission_date DESC, b.student_id DESC LIMIT ?",
+                    (*params, limit + 1),
+                )
             )
-            total_paid, total_discount = cursor.fetchone()
-            total_paid = total_paid or 0
-            total_discount = total_discount or 0
-            
-            # Calculate balance
-            balance = course_fee - total_paid - total_discount
-            
-            # Determine status
-            if balance <= 0:
-                status = "PAID"
-            elif total_paid > 0 or total_discount > 0:
-                status = "PARTIAL"
+
+        return keyset_page(rows, limit, ("admission_date", "student_id"))
+
+    @staticmethod
+    def count_fee_summary(status: Optional[str] = None) -> int:
+        """Number of students in the fee summary, optionally with one status"""
+        with read_connection() as conn:
+            if status:
+                row = conn.execute("SELECT COUNT(*) FROM student_fee_balances WHERE status = ?", (status,)).fetchone()
             else:
-                status = "PENDING"
-            
-            # Check if overdue (more than 1 month since admission)
-            admission_date = datetime.strptime(student[6], "%Y-%m-%d %H:%M:%S")
-            today = datetime.now()
-            months_diff = (today.year - admission_date.year) * 12 + (today.month - admission_date.month)
-            
-            if balance > 0 and months_diff > 0:
-                status = "OVERDUE"
-            
-            fee_summary.append({
-                "student_id": student_id,
-                "student_name": f"{student[1]} {student[2] or ''} {student[3]}".strip(),
-                "mobile_number": student[4],
-                "course_name": student[5],
-                "admission_date": student[6],
-                "course_fee": course_fee,
-                "total_paid": total_paid,
-                "total_discount": total_discount,
-                "balance": balance,
-                "status": status,
-                "is_overdue": status == "OVERDUE",
-                "months_overdue": months_diff if status == "OVERDUE" else 0,
-            })
-
-        conn.close()
-        return fee_summary
+                row = conn.execute("SELECT COUNT(*) FROM student_fee_balances").fetchone()
+            return row[0]
+
+    @staticmethod
+    def get_overdue_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        min_months: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of overdue students, longest overdue first, and the next cursor"""
+        limit = page_size(limit)
+        conditions = ["b.status = 'OVERDUE'"]
+        params: List[Any] = []
+
+        if min_months:
+            conditions.append("b.months_overdue >= ?")
+            params.append(min_months)
+        if cursor:
+            conditions.append("(b.months_overdue, b.student_id) < (?, ?)")
+            params.extend(decode_cursor(cursor, 2))
+
+        with read_connection() as conn:
+            rows = FEE_SUMMARY.all(
+                conn.execute(
+                    f"""
+                    {FEE_SUMMARY_SQL}
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY b.months_overdue DESC, b.student_id DESC
+                    LIMIT ?
+                    """,
+                    (*params, limit + 1),
+                )
+            )
+
+        return keyset_page(rows, limit, ("months_overdue", "student_id"))
+
+    @staticmethod
+    def count_overdue(min_months: Optional[int] = None) -> int:
+        """Number of students get_overdue_page lists, across all pages"""
+        with read_connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM student_fee_balances WHERE status = 'OVERDUE' AND months_overdue >= ?",
+                (min_months or 0,),
+            ).fetchone()[0]
+
+    @staticmethod
+    def get_collections(
+        granularity: str = "day",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        payment_method: Optional[str] = None,
+        handled_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Collection totals per day or month, each split by payment method and staff member.
+
+        Reads the fee_collections rollup, so a year costs at most a few
+        thousand rows whatever the number of payments. Month reports cover
+        the whole months that date_from and date_to fall in.
+        """
+        length = COLLECTION_PERIODS[granularity]
+        conditions = ["granularity = ?"]
+        params: List[Any] = [granularity]
+
+        if date_from:
+            conditions.append("period >= ?")
+            params.append(date_from.isoformat()[:length])
+        if date_to:
+            conditions.append("period <= ?")
+            params.append(date_to.isoformat()[:length])
+        if payment_method:
+            conditions.append("payment_method = ?")
+            params.append(payment_method)
+        if handled_by:
+            conditions.append("handled_by = ?")
+            params.append(handled_by)
+
+        # Rows are unique per period, method and handler, and come in
+        # primary key (period) order, so they are folded without a GROUP BY
+        with read_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT period, payment_method, handled_by, payment_count, amount, discount, late_fee
+                FROM fee_collections
+                WHERE {' AND '.join(conditions)}
+                ORDER BY period
+                """,
+                params,
+            ).fetchall()
+
+        # Accumulate each period into [count, amount, discount, late_fee]
+        # lists per method and handler; dicts are built once per period
+        collections = []
+        current, by_method, by_handler = None, {}, {}
+        for period, method, handler, count, amount, discount, late_fee in rows:
+            if period != current:
+                if current is not None:
+                    collections.append(_collection_period(current, by_method, by_handler))
+                current, by_method, by_handler = period, {}, {}
+            for parts in (
+                by_method.get(method) or by_method.setdefault(method, [0, 0, 0, 0]),
+                by_handler.get(handler) or by_handler.setdefault(handler, [0, 0, 0, 0]),
+            ):
+                parts[0] += count
+                parts[1] += amount
+                parts[2] += discount
+                parts[3] += late_fee
+        if current is not None:
+            collections.append(_collection_period(current, by_method, by_handler))
+
+        totals = _sum_collections([period[key] for key in COLLECTION_TOTALS] for period in collections)
+        return {"collections": collections, "totals": totals}
 
     @staticmethod
     def get_student_fee_details(student_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed fee information for a specific student"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get student info
-        cursor.execute(
-            """
-            SELECT 
-                sa.id, sa.first_name, sa.middle_name, sa.last_name,
-                sa.mobile_number, sa.course_name, sa.created_at,
-                c.fees as course_fee
-            FROM student_admissions sa
-            LEFT JOIN courses c ON sa.course_name = c.course_name
-            WHERE sa.id = ?
-            """,
-            (student_id,),
-        )
-
-        student = cursor.fetchone()
-        if not student:
-            conn.close()
-            return None
-
-        # Get total paid and total discount
-        cursor.execute(
-            "SELECT COALESCE(SUM(amount), 0), COALESCE(SUM(discount), 0) FROM fee_payments WHERE student_id = ?",
-            (student_id,)
-        )
-        total_paid, total_discount = cursor.fetchone()
-        total_paid = total_paid or 0
-        total_discount = total_discount or 0
-
-        # Get payment history
-        cursor.execute(
-            """
-            SELECT 
-                id, amount, payment_date, payment_method, transaction_id,
-                notes, late_fee, discount, handled_by, created_at
-            FROM fee_payments
-            WHERE student_id = ?
-            ORDER BY payment_date DESC
-            """,
-            (student_id,),
-        )
-
-        payments = []
-        for row in cursor.fetchall():
-            payments.append({
-                "id": row[0],
-                "amount": row[1],
-                "payment_date": row[2],
-                "payment_method": row[3],
-                "transaction_id": row[4],
-                "notes": row[5],
-                "late_fee": row[6],
-                "discount": row[7],
-                "handled_by": row[8],
-                "created_at": row[9],
-            })
-
-        course_fee = student[7] or 2000
-        balance = course_fee - total_paid - total_discount
-
-        conn.close()
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            # Get student info and balance
+            cursor.execute(
+                f"""
+                SELECT
+                    sa.id, {full_name("sa")}, sa.mobile_number, sa.course_name, sa.created_at,
+                    b.course_fee, b.total_paid, b.total_discount, b.balance,
+                    b.status, b.months_overdue, b.late_fee_accrued
+                FROM student_admissions sa
+                JOIN student_fee_balances b ON b.student_id = sa.id
+                WHERE sa.id = ?
+                """,
+                (student_id,),
+            )
+
+            student = cursor.fetchone()
+            if not student:
+                return None
+
+            # Get payment history
+            cursor.execute(
+                f"""
+                SELECT {PAYMENT_HISTORY.columns}
+                FROM fee_payments fp
+                WHERE fp.student_id = ?
+                ORDER BY fp.payment_date DESC
+                """,
+                (student_id,),
+            )
+            payments = PAYMENT_HISTORY.all(cursor)
 
         return {
             "student_id": student[0],
-            "student_name": f"{student[1]} {student[2] or ''} {student[3]}".strip(),
-            "mobile_number": student[4],
-            "course_name": student[5],
-            "admission_date": student[6],
-            "course_fee": course_fee,
-            "total_paid": total_paid,
-            "total_discount": total_discount,
-            "balance": balance,
+            "student_name": student[1],
+            "mobile_number": student[2],
+            "course_name": student[3],
+            "admission_date": student[4],
+            "course_fee": student[5],
+            "total_paid": student[6],
+            "total_discount": student[7],
+            "balance": student[8],
+            "status": student[9],
+            "months_overdue": student[10],
+            "late_fee_accrued": student[11],
             "payments": payments,
         } 
\ No newline at end of file
@@ -1,326 +1,397 @@
-from typing import Any, Dict, List
-
-from .connection import get_db_connection
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .connection import db_connection, read_connection
+from .mapping import RowMapper
+from .pagination import decode_cursor, keyset_page, page_size
+
+FOLLOWUP_FIELDS = [
+    ("f.id", "id"),
+    ("f.enquiry_id", "enquiry_id"),
+    ("f.followup_date", "followup_date"),
+    ("f.status", "status"),
+    ("f.notes", "notes"),
+    ("f.next_followup_date", "next_followup_date"),
+    ("f.handled_by", "handled_by"),
+    ("f.created_at", "created_at"),
+    ("f.updated_at", "updated_at"),
+]
+
+FOLLOWUP = RowMapper(FOLLOWUP_FIELDS)
+
+FOLLOWUP_WITH_ENQUIRY = RowMapper(
+    FOLLOWUP_FIELDS
+    + [
+        ("e.first_name || ' ' || e.last_name", "student_name"),
+        ("e.mobile_number", "mobile_number"),
+        ("e.course_name", "course_name"),
+    ]
+)
+
+FOLLOWUP_SUMMARY = RowMapper(
+    [
+        ("e.id", "id"),
+        ("e.first_name", "firstName"),
+        ("COALESCE(e.middle_name, '')", "middleName"),
+        ("e.last_name", "lastName"),
+        ("e.mobile_number", "mobileNumber"),
+        ("e.course_name", "courseName"),
+        ("DATE(e.created_at)", "enquiryDate"),
+        ("COALESCE(latest_followup.status, 'PENDING')", "currentStatus"),
+        ("latest_followup.followup_date", "lastFollowup"),
+        ("latest_followup.next_followup_date", "nextFollowup"),
+        ("COALESCE(followup_counts.total_followups, 0)", "followupCount"),
+        ("latest_followup.notes", "latestNotes"),
+    ]
+)
+
+OVERDUE_FOLLOWUP = RowMapper(
+    [
+        ("e.id", "enquiry_id"),
+        ("e.first_name || ' ' || e.last_name", "student_name"),
+        ("e.mobile_number", "mobile_number"),
+        ("e.course_name", "course_name"),
+        ("latest_followup.next_followup_date", "next_followup_date"),
+        (
+            "CAST(JULIANDAY('now') - JULIANDAY(latest_followup.next_followup_date) AS INTEGER)",
+            "days_overdue",
+        ),
+    ]
+)
+
+
+# sort -> (ORDER BY, keyset comparison, key response fields)
+FOLLOWUP_SORTS = {
+    # History, latest first
+    "followup_date": (
+        "f.followup_date DESC, f.id DESC",
+        "(f.followup_date, f.id) < (?, ?)",
+        ("followup_date", "id"),
+    ),
+    # Due list, soonest first
+    "next_followup_date": (
+        "f.next_followup_date ASC, f.id ASC",
+        "(f.next_followup_date, f.id) > (?, ?)",
+        ("next_followup_date", "id"),
+    ),
+}
+
+
+def _list_filters(
+    sort: str,
+    status: Optional[str],
+    handled_by: Optional[str],
+    followup_from: Optional[date],
+    followup_to: Optional[date],
+    next_from: Optional[date],
+    next_to: Optional[date],
+) -> Tuple[List[str], List[Any]]:
+    """WHERE conditions and parameters shared by get_page and count"""
+    conditions = []
+    params: List[Any] = []
+
+    if status:
+        conditions.append("f.status = ?")
+        params.append(status)
+    if handled_by:
+        conditions.append("f.handled_by = ?")
+        params.append(handled_by)
+    if followup_from:
+        conditions.append("f.followup_date >= ?")
+        params.append(followup_from.isoformat())
+    if followup_to:
+        conditions.append("f.followup_date < date(?, '+1 day')")
+        params.append(followup_to.isoformat())
+    if next_from:
+        conditions.append("f.next_followup_date >= ?")
+        params.append(next_from.isoformat())
+    if next_to:
+        conditions.append("f.next_followup_date < date(?, '+1 day')")
+        params.append(next_to.isoformat())
+    if sort == "next_followup_date":
+        conditions.append("f.next_followup_date IS NOT NULL")
+    return conditions, params
 
 
 class FollowupRepository:
     @staticmethod
     def create(followup_data: Dict[str, Any]) -> int:
         """Create a new follow-up record"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO followups (
-                enquiry_id, followup_date, status, notes,
-                next_followup_date, handled_by
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                followup_data["enquiry_id"],
-                followup_data["followup_date"],
-                followup_data["status"],
-                followup_data.get("notes", ""),
-                followup_data.get("next_followup_date"),
-                followup_data["handled_by"],
-            ),
-        )
+        with db_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                INSERT INTO followups (
+                    enquiry_id, followup_date, status, notes,
+                    next_followup_date, handled_by
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    followup_data["enquiry_id"],
+                    followup_data["followup_date"],
+                    followup_data["status"],
+                    followup_data.get("notes", ""),
+                    followup_data.get("next_followup_date"),
+                    followup_data["handled_by"],
+                ),
+            )
 
-        followup_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            followup_id = cursor.lastrowid
         return followup_id
 
     @staticmethod
     def get_by_enquiry_id(enquiry_id: int) -> List[Dict[str, Any]]:
         """Get all follow-ups for a specific enquiry"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, enquiry_id, followup_date, status, notes,
-                   next_followup_date, handled_by, created_at, updated_at
-            FROM followups
-            WHERE enquiry_id = ?
-            ORDER BY followup_date DESC
-            """,
-            (enquiry_id,),
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        followups = []
-        for row in rows:
-            followups.append(
-                {
-                    "id": row[0],
-                    "enquiry_id": row[1],
-                    "followup_date": row[2],
-                    "status": row[3],
-                    "notes": row[4],
-                    "next_followup_date": row[5],
-                    "handled_by": row[6],
-                    "created_at": row[7],
-                    "updated_at": row[8],
-                }
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {FOLLOWUP.columns}
+                FROM followups f
+                WHERE f.enquiry_id = ?
+                ORDER BY f.followup_date DESC
+                """,
+                (enquiry_id,),
             )
 
-        return followups
+            return FOLLOWUP.all(cursor)
 
     @staticmethod
     def get_all() -> List[Dict[str, Any]]:
         """Get all follow-ups"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT f.id, f.enquiry_id, f.followup_date, f.status, f.notes,
-                   f.next_followup_date, f.handled_by, f.created_at, f.updated_at,
-                   e.first_name, e.last_name, e.mobile_number, e.course_name
-            FROM followups f
-            JOIN student_enquiries e ON f.enquiry_id = e.id
-            ORDER BY f.followup_date DESC
-            """
-        )
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {FOLLOWUP_WITH_ENQUIRY.columns}
+                FROM followups f
+                JOIN student_enquiries e ON f.enquiry_id = e.id
+                ORDER BY f.followup_date DESC
+                """
+            )
 
-        rows = cursor.fetchall()
-        conn.close()
-
-        followups = []
-        for row in rows:
-            followups.append(
-                {
-                    "id": row[0],
-                    "enquiry_id": row[1],
-                    "followup_date": row[2],
-                    "status": row[3],
-                    "notes": row[4],
-                    "next_followup_date": row[5],
-                    "handled_by": row[6],
-                    "created_at": row[7],
-                    "updated_at": row[8],
-                    "student_name": f"{row[9]} {row[10]}",
-                    "mobile_number": row[11],
-                    "course_name": row[12],
-                }
+            return FOLLOWUP_WITH_ENQUIRY.all(cursor)
+
+    @staticmethod
+    def get_page(
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "followup_date",
+        status: Optional[str] = None,
+        handled_by: Optional[str] = None,
+        followup_from: Optional[date] = None,
+        followup_to: Optional[date] = None,
+        next_from: Optional[date] = None,
+        next_to: Optional[date] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of follow-ups and the next cursor.
+
+        Sorting by next_followup_date lists only follow-ups that have one.
+        Each filter plus sort is served by an index from migration 8, e.g.
+        a counsellor's due list by idx_followups_handled_next.
+        """
+        order_by, after, key = FOLLOWUP_SORTS[sort]
+        limit = page_size(limit)
+        conditions, params = _list_filters(
+            sort, status, handled_by, followup_from, followup_to, next_from, next_to
+        )
+        if cursor:
+            conditions.append(after)
+            params.extend(decode_cursor(cursor, 2))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            rows = FOLLOWUP_WITH_ENQUIRY.all(
+                conn.execute(
+                    f"""
+                    SELECT {FOLLOWUP_WITH_ENQUIRY.columns}
+                    FROM followups f
+                    JOIN student_enquiries e ON f.enquiry_id = e.id
+                    {where}
+                    ORDER BY {order_by}
+                    LIMIT ?
+                    """,
+                    (*params, limit + 1),
+                )
             )
 
-        return followups
+        return keyset_page(rows, limit, key)
 
     @staticmethod
-    def get_enquiries_with_followup_summary() -> List[Dict[str, Any]]:
-        """Get all enquiries with their follow-up summary"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT
-                e.id,
-                e.first_name,
-                e.middle_name,
-                e.last_name,
-                e.mobile_number,
-                e.course_name,
-                DATE(e.created_at) as enquiry_date,
-                COALESCE(latest_followup.status, 'PENDING') as current_status,
-                latest_followup.followup_date as last_followup,
-                latest_followup.next_followup_date as next_followup,
-                COALESCE(followup_counts.total_followups, 0) as followup_count,
-                latest_followup.notes as latest_notes
-            FROM student_enquiries e
-            LEFT JOIN (
-                SELECT
-                    enquiry_id,
-                    followup_date,
-                    next_followup_date,
-                    status,
-                    notes,
-                    ROW_NUMBER() OVER (PARTITION BY enquiry_id ORDER BY followup_date DESC) as rn
-                FROM followups
-            ) latest_followup ON e.id = latest_followup.enquiry_id AND latest_followup.rn = 1
-            LEFT JOIN (
-                SELECT enquiry_id, COUNT(*) as total_followups
-                FROM followups
-                GROUP BY enquiry_id
-            ) followup_counts ON e.id = followup_counts.enquiry_id
-            ORDER BY
-                CASE
-                    WHEN latest_followup.next_followup_date IS NULL THEN 1
-                    WHEN latest_followup.next_followup_date < DATE('now') THEN 0
-                    ELSE 2
-                END,
-                latest_followup.next_followup_date ASC,
-                e.created_at DESC
-            """
+    def count(
+        sort: str = "followup_date",
+        status: Optional[str] = None,
+        handled_by: Optional[str] = None,
+        followup_from: Optional[date] = None,
+        followup_to: Optional[date] = None,
+        next_from: Optional[date] = None,
+        next_to: Optional[date] = None,
+    ) -> int:
+        """Number of follow-ups get_page lists for these filters, across all pages"""
+        conditions, params = _list_filters(
+            sort, status, handled_by, followup_from, followup_to, next_from, next_to
         )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with read_connection() as conn:
+            return conn.execute(
+                f"""
+                SELECT COUNT(*)
+                FROM followups f
+                JOIN student_enquiries e ON f.enquiry_id = e.id
+                {where}
+                """,
+                params,
+            ).fetchone()[0]
 
-        rows = cursor.fetchall()
-        conn.close()
-
-        enquiries = []
-        for row in rows:
-            enquiries.append(
-                {
-                    "id": row[0],
-                    "firstName": row[1],
-                    "middleName": row[2] or "",
-                    "lastName": row[3],
-                    "mobileNumber": row[4],
-                    "courseName": row[5],
-                    "enquiryDate": row[6],
-                    "currentStatus": row[7],
-                    "lastFollowup": row[8],
-                    "nextFollowup": row[9],
-                    "followupCount": row[10],
-                    "latestNotes": row[11],
-                }
+    @staticmethod
+    def get_enquiries_with_followup_summary() -> List[Dict[str, Any]]:
+        """Get all enquiries with their follow-up summary"""
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {FOLLOWUP_SUMMARY.columns}
+                FROM student_enquiries e
+                LEFT JOIN (
+                    SELECT
+                        enquiry_id,
+                        followup_date,
+                        next_followup_date,
+                        status,
+                        notes,
+                        ROW_NUMBER() OVER (PARTITION BY enquiry_id ORDER BY followup_date DESC) as rn
+                    FROM followups
+                ) latest_followup ON e.id = latest_followup.enquiry_id AND latest_followup.rn = 1
+                LEFT JOIN (
+                    SELECT enquiry_id, COUNT(*) as total_followups
+                    FROM followups
+                    GROUP BY enquiry_id
+                ) followup_counts ON e.id = followup_counts.enquiry_id
+                ORDER BY
+                    CASE
+                        WHEN latest_followup.next_followup_date IS NULL THEN 1
+                        WHEN latest_followup.next_followup_date < DATE('now') THEN 0
+                        ELSE 2
+                    END,
+                    latest_followup.next_followup_date ASC,
+                    e.created_at DESC
+                """
             )
 
-        return enquiries
+            return FOLLOWUP_SUMMARY.all(cursor)
 
     @staticmethod
     def get_overdue_followups() -> List[Dict[str, Any]]:
         """Get enquiries with overdue follow-ups"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT
-                e.id,
-                e.first_name,
-                e.last_name,
-                e.mobile_number,
-                e.course_name,
-                latest_followup.next_followup_date,
-                JULIANDAY('now') - JULIANDAY(latest_followup.next_followup_date) as days_overdue
-            FROM student_enquiries e
-            JOIN (
-                SELECT
-                    enquiry_id,
-                    next_followup_date,
-                    ROW_NUMBER() OVER (PARTITION BY enquiry_id ORDER BY followup_date DESC) as rn
-                FROM followups
-                WHERE next_followup_date IS NOT NULL
-            ) latest_followup ON e.id = latest_followup.enquiry_id AND latest_followup.rn = 1
-            WHERE latest_followup.next_followup_date < DATE('now')
-            ORDER BY days_overdue DESC
-            """
-        )
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        overdue = []
-        for row in rows:
-            overdue.append(
-                {
-                    "enquiry_id": row[0],
-                    "student_name": f"{row[1]} {row[2]}",
-                    "mobile_number": row[3],
-                    "course_name": row[4],
-                    "next_followup_date": row[5],
-                    "days_overdue": int(row[6]),
-                }
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {OVERDUE_FOLLOWUP.columns}
+                FROM student_enquiries e
+                JOIN (
+                    SELECT
+                        enquiry_id,
+                        next_followup_date,
+                        ROW_NUMBER() OVER (PARTITION BY enquiry_id ORDER BY followup_date DESC) as rn
+                    FROM followups
+                    WHERE next_followup_date IS NOT NULL
+                ) latest_followup ON e.id = latest_followup.enquiry_id AND latest_followup.rn = 1
+                WHERE latest_followup.next_followup_date < DATE('now')
+                ORDER BY latest_followup.next_followup_date ASC
+                """
             )
 
-        return overdue
+            return OVERDUE_FOLLOWUP.all(cursor)
 
     @staticmethod
     def update(followup_id: int, update_data: Dict[str, Any]) -> bool:
         """Update a follow-up record"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
 
-        # Build dynamic query based on provided fields
-        update_fields = []
-        update_values = []
+            # Build dynamic query based on provided fields
+            update_fields = []
+            update_values = []
 
-        for field, value in update_data.items():
-            if value is not None:
-                update_fields.append(f"{field} = ?")
-                update_values.append(value)
+            for field, value in update_data.items():
+                if value is not None:
+                    update_fields.append(f"{field} = ?")
+                    update_values.append(value)
 
-        if not update_fields:
-            conn.close()
-            return False
+            if not update_fields:
+                return False
 
-        update_values.append(followup_id)
-        query = f"UPDATE followups SET {', '.join(update_fields)} WHERE id = ?"
+            update_values.append(followup_id)
+            query = f"UPDATE followups SET {', '.join(update_fields)} WHERE id = ?"
 
-        cursor.execute(query, update_values)
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+            cursor.execute(query, update_values)
+            rows_affected = cursor.rowcount
 
         return rows_affected > 0
 
     @staticmethod
     def delete(followup_id: int) -> bool:
         """Delete a follow-up record"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("DELETE FROM followups WHERE id = ?", (followup_id,))
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+            cursor.execute("DELETE FROM followups WHERE id = ?", (followup_id,))
+            rows_affected = cursor.rowcount
 
         return rows_affected > 0
 
     @staticmethod
     def get_followup_stats() -> Dict[str, Any]:
         """Get follow-up statistics"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Total follow-ups
-        cursor.execute("SELECT COUNT(*) FROM followups")
-        total_followups = cursor.fetchone()[0]
-
-        # Follow-ups by status
-        cursor.execute(
-            """
-            SELECT status, COUNT(*) as count
-            FROM followups
-            GROUP BY status
-            """
-        )
-        status_counts = {row[0]: row[1] for row in cursor.fetchall()}
-
-        # Overdue count
-        cursor.execute(
-            """
-            SELECT COUNT(DISTINCT enquiry_id)
-            FROM followups f1
-            WHERE next_followup_date < DATE('now')
-            AND NOT EXISTS (
-                SELECT 1 FROM followups f2
-                WHERE f2.enquiry_id = f1.enquiry_id
-                AND f2.followup_date > f1.followup_date
-            )
-            """
-        )
-        overdue_count = cursor.fetchone()[0]
+        with read_connection() as conn:
+            cursor = conn.cursor()
 
-        # Average follow-ups per enquiry
-        cursor.execute(
-            """
-            SELECT AVG(followup_count) FROM (
-                SELECT COUNT(*) as followup_count
+            # Total follow-ups
+            cursor.execute("SELECT COUNT(*) FROM followups")
+            total_followups = cursor.fetchone()[0]
+
+            # Follow-ups by status
+            cursor.execute(
+                """
+                SELECT status, COUNT(*) as count
                 FROM followups
-                GROUP BY enquiry_id
+                GROUP BY status
+                """
             )
-            """
-        )
-        avg_followups = cursor.fetchone()[0] or 0
-
-        conn.close()
+            status_counts = {row[0]: row[1] for row in cursor.fetchall()}
+
+            # Overdue count
+            cursor.execute(
+                """
+                SELECT COUNT(DISTINCT enquiry_id)
+                FROM followups f1
+                WHERE next_followup_date < DATE('now')
+                AND NOT EXISTS (
+                    SELECT 1 FROM followups f2
+                    WHERE f2.enquiry_id = f1.enquiry_id
+                    AND f2.followup_date > f1.followup_date
+                )
+                """
+            )
+            overdue_count = cursor.fetchone()[0]
+
+            # Average follow-ups per enquiry
+            cursor.execute(
+                """
+                SELECT AVG(followup_count) FROM (
+                    SELECT COUNT(*) as followup_count
+                    FROM followups
+                    GROUP BY enquiry_id
+                )
+                """
+            )
+            avg_followups = cursor.fetchone()[0] or 0
 
         return {
             "total_followups": total_followups,
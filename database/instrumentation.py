@@ -0,0 +1,315 @@
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import deque
+from functools import lru_cache
+from itertools import chain
+from logging.handlers import RotatingFileHandler
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from config import (DATABASE_FILE, DB_QUERY_SAMPLES, DB_SLOW_QUERY_LOG,
+                    DB_SLOW_QUERY_LOG_BACKUPS, DB_SLOW_QUERY_LOG_BYTES,
+                    DB_SLOW_QUERY_MS)
+
+# Rows pulled per fetchmany() when a cursor is iterated
+_ITER_CHUNK = 256
+
+# Frames in these modules are plumbing, not the repository method to blame
+_INTERNAL_MODULES = {__name__, "database.connection", "database.mapping"}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(sql: str) -> str:
+    """Collapse a statement to its shape: literals become ?, whitespace is squeezed"""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _caller() -> str:
+    """Qualified name of the database-layer function running the query"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("database.") and module not in _INTERNAL_MODULES:
+            name = frame.f_code.co_qualname
+            # Class methods already read Repository.method; prefix plain functions
+            return name if "." in name else f"{module.rpartition('.')[2]}.{name}"
+        frame = frame.f_back
+    return "other"
+
+
+class StatementStats:
+    """Running totals plus a window of recent timings for one statement"""
+
+    __slots__ = ("count", "errors", "total", "rows", "samples")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.rows = 0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class QueryStats:
+    """Per-process registry of statement timings keyed by (statement, caller)"""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window: int = DB_QUERY_SAMPLES):
+        self.window = window
+        self._stats: Dict[Tuple[str, str], StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, caller: str, elapsed: float, rows: int, failed: bool = False) -> None:
+        key = (normalize_statement(sql), caller)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(self.window)
+            stats.count += 1
+            stats.total += elapsed
+            stats.rows += rows
+            stats.samples.append(elapsed)
+            if failed:
+                stats.errors += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Totals and p50/p95/p99 per statement, slowest total first"""
+        with self._lock:
+            items = [
+                (statement, caller, stats.count, stats.errors, stats.total, stats.rows, sorted(stats.samples))
+                for (statement, caller), stats in self._stats.items()
+            ]
+
+        result = []
+        for statement, caller, count, errors, total, rows, ordered in items:
+            result.append({
+                "statement": statement,
+                "caller": caller,
+                "count": count,
+                "errors": errors,
+                "total_seconds": total,
+                "rows": rows,
+                "quantiles": {q: _quantile(ordered, q) for q in self.QUANTILES},
+            })
+        result.sort(key=lambda item: item["total_seconds"], reverse=True)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def parameter_shape(parameters: Any) -> str:
+    """Types of the bound parameters, never their values"""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+
+def plan_flags(plan: List[Tuple[int, int, str]]) -> List[str]:
+    """Plan steps worth a look: full table scans and temp B-trees"""
+    flags = []
+    derived = set()  # subqueries and views SQLite built itself; scanning those is expected
+    for _, _, detail in plan:
+        if detail.startswith(("MATERIALIZE ", "CO-ROUTINE ")):
+            derived.add(detail.split(" ", 1)[1])
+        # "SCAN t USING [COVERING] INDEX ..." walks an index and "SCAN t VIRTUAL
+        # TABLE INDEX ..." hands the lookup to the module; bare "SCAN t" reads every row
+        elif detail.startswith("SCAN ") and " USING " not in detail and " VIRTUAL TABLE " not in detail:
+            name = detail[5:]
+            if name not in derived and not name.startswith("("):
+                flags.append(f"FULL_SCAN({name})")
+        elif "TEMP B-TREE" in detail:
+            flags.append(f"TEMP_B_TREE({detail.rpartition(' FOR ')[2]})")
+    return flags
+
+
+def format_plan(plan: List[Tuple[int, int, str]]) -> List[str]:
+    """EXPLAIN QUERY PLAN rows as an indented tree"""
+    depth = {0: 0}
+    lines = []
+    for node, parent, detail in plan:
+        depth[node] = depth.get(parent, 0) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+class SlowQueryLog:
+    """Writes statements over a time threshold, with their plan, to a rotating file"""
+
+    def __init__(self, path: str = DB_SLOW_QUERY_LOG, threshold_ms: float = DB_SLOW_QUERY_MS):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self._logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    handler = RotatingFileHandler(
+                        self.path, maxBytes=DB_SLOW_QUERY_LOG_BYTES,
+                        backupCount=DB_SLOW_QUERY_LOG_BACKUPS, encoding="utf-8",
+                    )
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                    logger = logging.getLogger("database.slow_queries")
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    logger.addHandler(handler)
+                    self._logger = logger
+        return self._logger
+
+    def explain(self, sql: str, parameters: Any) -> List[Tuple[int, int, str]]:
+        """EXPLAIN QUERY PLAN on a private read-only connection.
+
+        The connection that ran the query may already be back in its pool
+        and in use by another thread, so it is not touched here.
+        """
+        path = quote(os.path.abspath(DATABASE_FILE))
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return [tuple(row[:2]) + (row[3],) for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+        finally:
+            conn.close()
+
+    def record(self, sql: str, parameters: Any, caller: str, elapsed: float, rows: int) -> None:
+        try:
+            plan = self.explain(sql, parameters)
+        except sqlite3.Error as e:
+            plan, plan_error = [], str(e)
+        else:
+            plan_error = None
+
+        flags = plan_flags(plan)
+        lines = [
+            f"slow query {elapsed * 1000:.1f} ms caller={caller} rows={rows}"
+            + (f" flags={','.join(flags)}" if flags else ""),
+            f"  params: {parameter_shape(parameters)}",
+            f"  sql: {_WHITESPACE.sub(' ', sql).strip()}",
+            "  plan:" + (f" unavailable ({plan_error})" if plan_error else ""),
+        ]
+        lines.extend("  " + line for line in format_plan(plan))
+        self._get_logger().info("\n".join(lines))
+
+
+slow_query_log = SlowQueryLog()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times each statement from execute() to its last fetch.
+
+    A statement is recorded once it is exhausted, when the cursor runs
+    another statement, or when the cursor is closed or collected, so
+    the time spent stepping through rows is charged to the query.
+    """
+
+    _pending: Optional[list] = None  # [sql, caller, elapsed, rows, parameters]
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, caller, elapsed, rows, parameters = pending
+            # SELECTs count rows fetched; DML reports rows affected
+            rows = rows or max(self.rowcount, 0)
+            query_stats.record(sql, caller, elapsed, rows)
+            if slow_query_log.enabled and elapsed >= slow_query_log.threshold:
+                slow_query_log.record(sql, parameters, caller, elapsed, rows)
+
+    def _run(self, method, sql: str, parameters, sample_parameters) -> "TimedCursor":
+        self._flush()
+        caller = _caller()
+        started = perf_counter()
+        try:
+            method(sql, parameters)
+        except sqlite3.Error:
+            query_stats.record(sql, caller, perf_counter() - started, 0, failed=True)
+            raise
+        self._pending = [sql, caller, perf_counter() - started, 0, sample_parameters]
+        return self
+
+    def execute(self, sql: str, parameters=()) -> "TimedCursor":
+        return self._run(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> "TimedCursor":
+        # The first row stands in for the batch in the slow-query log; peek at
+        # it without materializing generators
+        rows = iter(seq_of_parameters)
+        first = next(rows, None)
+        if first is None:
+            return self._run(super().executemany, sql, (), ())
+        return self._run(super().executemany, sql, chain((first,), rows), first)
+
+    def executescript(self, sql_script: str) -> "TimedCursor":
+        self._flush()
+        super().executescript(sql_script)
+        return self
+
+    def _fetched(self, started: float, rows: int, done: bool) -> None:
+        pending = self._pending
+        if pending is not None:
+            pending[2] += perf_counter() - started
+            pending[3] += rows
+            if done:
+                self._flush()
+
+    def fetchone(self):
+        started = perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        size = self.arraysize if size is None else size
+        started = perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        # Fetching in chunks keeps the per-row path in C
+        while True:
+            rows = self.fetchmany(_ITER_CHUNK)
+            yield from rows
+            if len(rows) < _ITER_CHUNK:
+                return
+
+    def close(self) -> None:
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        self._flush()
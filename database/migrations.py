@@ -0,0 +1,841 @@
+import sqlite3
+import time
+from typing import Callable, List
+
+from .connection import get_db_connection
+from .fee_balances import (COMPUTED_FEE_BALANCES_SQL, CURRENT_MONTH_SQL,
+                           DEFAULT_COURSE_FEE, FEE_STATUS_SQL, MONTHS_OVERDUE_SQL,
+                           OVERDUE_SQL)
+
+
+def _column_names(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> None:
+    """Add a column unless an older, hand-patched database already has it"""
+    if column not in _column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _create_base_schema(conn: sqlite3.Connection) -> None:
+    """Tables, triggers, indexes and seed data formerly created by the init_* functions"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS student_enquiries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            middle_name TEXT,
+            last_name TEXT NOT NULL,
+            date_of_birth TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            marital_status TEXT NOT NULL,
+            mother_tongue TEXT NOT NULL,
+            aadhar_number TEXT NOT NULL,
+            correspondence_address TEXT NOT NULL,
+            city TEXT NOT NULL,
+            state TEXT NOT NULL,
+            district TEXT NOT NULL,
+            mobile_number TEXT NOT NULL,
+            alternate_mobile_number TEXT,
+            category TEXT NOT NULL,
+            educational_qualification TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            timing TEXT NOT NULL,
+            handled_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS student_admissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            middle_name TEXT,
+            last_name TEXT NOT NULL,
+            date_of_birth TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            marital_status TEXT NOT NULL,
+            mother_tongue TEXT NOT NULL,
+            aadhar_number TEXT NOT NULL,
+            correspondence_address TEXT NOT NULL,
+            city TEXT NOT NULL,
+            state TEXT NOT NULL,
+            district TEXT NOT NULL,
+            mobile_number TEXT NOT NULL,
+            alternate_mobile_number TEXT,
+            category TEXT NOT NULL,
+            educational_qualification TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            timing TEXT NOT NULL,
+            certificate_name TEXT NOT NULL,
+            referred_by TEXT,
+            photo_filename TEXT,
+            signature_filename TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    # Admission IDs start at 10001
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'student_admissions'"
+    ).fetchone()
+    if not row:
+        conn.execute(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('student_admissions', 10000)"
+        )
+    elif row[0] < 10000:
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = 10000 WHERE name = 'student_admissions'"
+        )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            hashed_password TEXT NOT NULL,
+            role TEXT NOT NULL CHECK(role IN ('staff', 'admin'))
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_name TEXT NOT NULL UNIQUE,
+            fees INTEGER NOT NULL CHECK(fees > 0),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS update_courses_timestamp
+        AFTER UPDATE ON courses
+        BEGIN
+            UPDATE courses SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+        """
+    )
+
+    # Insert default courses if table is empty
+    if conn.execute("SELECT COUNT(*) FROM courses").fetchone()[0] == 0:
+        default_courses = [
+            ("MS-CIT", 2500),
+            ("ADVANCE TALLY - CIT", 3500),
+            ("ADVANCE TALLY - KLIC", 3000),
+            ("ADVANCE EXCEL - CIT", 2000),
+            ("ENGLISH TYPING - MKCL", 1500),
+            ("ENGLISH TYPING - CIT", 1800),
+            ("MARATHI TYPING - MKCL", 1500),
+            ("DTP - CIT", 2200),
+            ("IT - KLIC", 4000),
+            ("KLIC DIPLOMA", 5000),
+        ]
+        conn.executemany(
+            "INSERT INTO courses (course_name, fees) VALUES (?, ?)", default_courses
+        )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS followups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            enquiry_id INTEGER NOT NULL,
+            followup_date TEXT NOT NULL,
+            status TEXT NOT NULL CHECK(status IN ('PENDING', 'INTERESTED', 'NOT_INTERESTED', 'ADMITTED')),
+            notes TEXT DEFAULT '',
+            next_followup_date TEXT,
+            handled_by TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (enquiry_id) REFERENCES student_enquiries (id) ON DELETE CASCADE
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS update_followups_timestamp
+        AFTER UPDATE ON followups
+        BEGIN
+            UPDATE followups SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+        """
+    )
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_followups_enquiry_id ON followups(enquiry_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_followups_next_date ON followups(next_followup_date)")
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fee_payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            amount REAL NOT NULL CHECK(amount > 0),
+            payment_date TEXT NOT NULL,
+            payment_method TEXT NOT NULL CHECK(payment_method IN ('CASH', 'CARD', 'UPI', 'BANK_TRANSFER', 'CHEQUE')),
+            transaction_id TEXT DEFAULT '',
+            notes TEXT DEFAULT '',
+            late_fee REAL DEFAULT 0,
+            discount REAL DEFAULT 0,
+            handled_by TEXT NOT NULL,
+            denominations TEXT,
+            serials_500 TEXT,
+            cheque_number TEXT,
+            bank_name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES student_admissions (id) ON DELETE CASCADE
+        )
+        """
+    )
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fee_payments_student_id ON fee_payments(student_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fee_payments_date ON fee_payments(payment_date)")
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS institute_settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            center_code TEXT DEFAULT '',
+            address TEXT DEFAULT '',
+            phone TEXT DEFAULT '',
+            email TEXT DEFAULT '',
+            website TEXT DEFAULT '',
+            logo TEXT DEFAULT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS update_institute_settings_timestamp
+        AFTER UPDATE ON institute_settings
+        BEGIN
+            UPDATE institute_settings SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+        """
+    )
+
+    # Insert default settings if table is empty
+    if conn.execute("SELECT COUNT(*) FROM institute_settings").fetchone()[0] == 0:
+        conn.execute(
+            """
+            INSERT INTO institute_settings (name, address, phone, email, website)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            ("EduManage", "", "", "", ""),
+        )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            batch_timing TEXT NOT NULL,
+            status TEXT NOT NULL CHECK(status IN ('PRESENT', 'ABSENT')),
+            marked_by TEXT DEFAULT 'System User',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(student_id, date),
+            FOREIGN KEY (student_id) REFERENCES student_admissions (id) ON DELETE CASCADE
+        )
+        """
+    )
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date_batch ON attendance(date, batch_timing)")
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS student_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            document_type TEXT NOT NULL CHECK(document_type IN (
+                'SIGNED_ADMISSION_FORM', 'IDENTITY_PROOF', 'ADDRESS_PROOF',
+                'EDUCATIONAL_CERTIFICATE', 'FINAL_CERTIFICATE', 'OTHER'
+            )),
+            filename TEXT NOT NULL,
+            original_filename TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            mime_type TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'UPLOADED' CHECK(status IN ('UPLOADED', 'PENDING', 'REJECTED')),
+            notes TEXT DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES student_admissions (id) ON DELETE CASCADE
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS update_documents_timestamp
+        AFTER UPDATE ON student_documents
+        BEGIN
+            UPDATE student_documents SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+        """
+    )
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_student_id ON student_documents(student_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_type ON student_documents(document_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_status ON student_documents(status)")
+
+
+def _add_fee_payment_discount(conn: sqlite3.Connection) -> None:
+    """Databases created before discounts existed lack fee_payments.discount"""
+    _add_column(conn, "fee_payments", "discount", "REAL DEFAULT 0")
+
+
+def _add_admission_exam_columns(conn: sqlite3.Connection) -> None:
+    """Learner credentials and exam results written by AdmissionRepository"""
+    _add_column(conn, "student_admissions", "learner_code", "TEXT")
+    _add_column(conn, "student_admissions", "era_id", "TEXT")
+    _add_column(conn, "student_admissions", "era_password", "TEXT")
+    _add_column(conn, "student_admissions", "exam_date", "TEXT")
+    _add_column(conn, "student_admissions", "era_score", "INTEGER")
+    _add_column(conn, "student_admissions", "final_score", "INTEGER")
+    _add_column(conn, "student_admissions", "result", "TEXT")
+
+
+def _add_enquiry_listing_indexes(conn: sqlite3.Connection) -> None:
+    """Keyset pagination on (created_at, id), optionally within one course"""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_enquiries_created "
+        "ON student_enquiries(created_at, id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_enquiries_course_created "
+        "ON student_enquiries(course_name, created_at, id)"
+    )
+
+
+def _add_admission_listing_indexes(conn: sqlite3.Connection) -> None:
+    """Covering indexes for AdmissionRepository.get_page.
+
+    Each index carries every ADMISSION_LIST column after its sort key, so
+    list pages never touch the (wide) table rows.
+    """
+    listed = "middle_name, mobile_number, timing, created_at, result"
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_admissions_list_id ON student_admissions"
+        f"(id, first_name, last_name, course_name, {listed})"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_admissions_list_course_id ON student_admissions"
+        f"(course_name, id, first_name, last_name, {listed})"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_admissions_list_name ON student_admissions"
+        f"(first_name, last_name, id, course_name, {listed})"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_admissions_list_course_name ON student_admissions"
+        f"(course_name, first_name, last_name, id, {listed})"
+    )
+
+
+def _add_table_versions(conn: sqlite3.Connection) -> None:
+    """Per-table change counters behind ETags (see database/table_versions.py).
+
+    Triggers bump a table's counter in the same transaction as every row
+    it writes, so all workers sharing the file see the same versions.
+    """
+    versioned = (
+        "student_enquiries",
+        "student_admissions",
+        "courses",
+        "followups",
+        "fee_payments",
+        "attendance",
+        "student_documents",
+        "institute_settings",
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)",
+        [(table,) for table in versioned],
+    )
+    for table in versioned:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END;
+                """
+            )
+
+
+def _create_search_index(conn: sqlite3.Connection, table: str, index: str, columns: List[str]) -> None:
+    """External-content FTS5 table over `columns` of `table`, synced by triggers"""
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+            {column_list},
+            content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {index} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {column_list} ON {table}
+        BEGIN
+            INSERT INTO {index} ({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {index} (rowid, {column_list}) VALUES (new.id, {new_values});
+        END;
+        """
+    )
+    # Index the rows that predate the triggers
+    conn.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def _add_student_search(conn: sqlite3.Connection) -> None:
+    """FTS5 indexes behind SearchRepository.search"""
+    person = [
+        "first_name", "middle_name", "last_name",
+        "mobile_number", "alternate_mobile_number", "aadhar_number", "city",
+    ]
+    _create_search_index(conn, "student_enquiries", "enquiries_fts", person)
+    _create_search_index(conn, "student_admissions", "admissions_fts", person + ["certificate_name"])
+
+
+def _add_followup_listing_indexes(conn: sqlite3.Connection) -> None:
+    """Indexes for FollowupRepository.get_page: history by followup_date, due lists by next_followup_date"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_followups_date ON followups(followup_date)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_followups_status_date ON followups(status, followup_date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_followups_handled_date ON followups(handled_by, followup_date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_followups_status_next ON followups(status, next_followup_date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_followups_handled_next ON followups(handled_by, next_followup_date)"
+    )
+
+
+def _add_student_fee_balances(conn: sqlite3.Connection) -> None:
+    """student_fee_balances read model (see database/fee_balances.py).
+
+    Triggers keep each admission's row current: payments add or remove
+    their amount, discount and late fee; a changed course, or a course
+    whose name or fee changes, reprices the admissions it covers.
+    balance is a stored generated column, so it can never drift from
+    the totals.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS student_fee_balances (
+            student_id INTEGER PRIMARY KEY,
+            course_fee INTEGER NOT NULL,
+            total_paid REAL NOT NULL DEFAULT 0,
+            total_discount REAL NOT NULL DEFAULT 0,
+            late_fee REAL NOT NULL DEFAULT 0,
+            balance REAL GENERATED ALWAYS AS (course_fee - total_paid - total_discount) STORED
+        )
+        """
+    )
+
+    course_fee = f"COALESCE((SELECT fees FROM courses WHERE course_name = {{}}), {DEFAULT_COURSE_FEE})"
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_admission_insert
+        AFTER INSERT ON student_admissions
+        BEGIN
+            INSERT INTO student_fee_balances (student_id, course_fee)
+            VALUES (new.id, {course_fee.format("new.course_name")});
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_admission_course
+        AFTER UPDATE OF course_name ON student_admissions
+        WHEN new.course_name IS NOT old.course_name
+        BEGIN
+            UPDATE student_fee_balances SET course_fee = {course_fee.format("new.course_name")}
+            WHERE student_id = new.id;
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS fee_balances_admission_delete
+        AFTER DELETE ON student_admissions
+        BEGIN
+            DELETE FROM student_fee_balances WHERE student_id = old.id;
+        END;
+        """
+    )
+
+    add_payment = """
+            UPDATE student_fee_balances SET
+                total_paid = total_paid + new.amount,
+                total_discount = total_discount + COALESCE(new.discount, 0),
+                late_fee = late_fee + COALESCE(new.late_fee, 0)
+            WHERE student_id = new.student_id;"""
+    remove_payment = """
+            UPDATE student_fee_balances SET
+                total_paid = total_paid - old.amount,
+                total_discount = total_discount - COALESCE(old.discount, 0),
+                late_fee = late_fee - COALESCE(old.late_fee, 0)
+            WHERE student_id = old.student_id;"""
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_payment_insert
+        AFTER INSERT ON fee_payments
+        BEGIN{add_payment}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_payment_update
+        AFTER UPDATE OF student_id, amount, discount, late_fee ON fee_payments
+        BEGIN{remove_payment}{add_payment}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_payment_delete
+        AFTER DELETE ON fee_payments
+        BEGIN{remove_payment}
+        END;
+        """
+    )
+
+    # Reprice the admissions on a course name the catalog gained, lost or changed
+    reprice = f"""
+            UPDATE student_fee_balances SET course_fee = COALESCE(
+                (SELECT c.fees FROM student_admissions sa JOIN courses c ON c.course_name = sa.course_name
+                 WHERE sa.id = student_fee_balances.student_id),
+                {DEFAULT_COURSE_FEE}
+            )
+            WHERE student_id IN (SELECT id FROM student_admissions WHERE course_name IN ({{}}));"""
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_course_insert
+        AFTER INSERT ON courses
+        BEGIN{reprice.format("new.course_name")}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_course_update
+        AFTER UPDATE OF course_name, fees ON courses
+        BEGIN{reprice.format("old.course_name, new.course_name")}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_course_delete
+        AFTER DELETE ON courses
+        BEGIN{reprice.format("old.course_name")}
+        END;
+        """
+    )
+
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO student_fee_balances
+            (student_id, course_fee, total_paid, total_discount, late_fee)
+        SELECT student_id, course_fee, total_paid, total_discount, late_fee
+        FROM ({COMPUTED_FEE_BALANCES_SQL})
+        """
+    )
+
+
+def _add_fee_status(conn: sqlite3.Connection) -> None:
+    """Stored fee status on student_fee_balances, for indexed OVERDUE lookups.
+
+    Triggers re-evaluate a row's status and months overdue whenever its
+    balance changes; FeeStatusRefresher re-evaluates all rows daily and
+    accrues late fees (see database/fee_balances.py).
+    """
+    _add_column(conn, "student_fee_balances", "admission_date", "TEXT")
+    _add_column(conn, "student_fee_balances", "status", "TEXT NOT NULL DEFAULT 'PENDING'")
+    _add_column(conn, "student_fee_balances", "months_overdue", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(conn, "student_fee_balances", "late_fee_accrued", "REAL NOT NULL DEFAULT 0")
+    conn.execute(
+        """
+        UPDATE student_fee_balances SET admission_date = (
+            SELECT created_at FROM student_admissions WHERE id = student_fee_balances.student_id
+        )
+        """
+    )
+
+    # Admissions now copy their date into the row
+    conn.execute("DROP TRIGGER IF EXISTS fee_balances_admission_insert")
+    conn.execute(
+        f"""
+        CREATE TRIGGER fee_balances_admission_insert
+        AFTER INSERT ON student_admissions
+        BEGIN
+            INSERT INTO student_fee_balances (student_id, course_fee, admission_date)
+            VALUES (
+                new.id,
+                COALESCE((SELECT fees FROM courses WHERE course_name = new.course_name), {DEFAULT_COURSE_FEE}),
+                new.created_at
+            );
+        END;
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS fee_balances_admission_date
+        AFTER UPDATE OF created_at ON student_admissions
+        WHEN new.created_at IS NOT old.created_at
+        BEGIN
+            UPDATE student_fee_balances SET admission_date = new.created_at WHERE student_id = new.id;
+        END;
+        """
+    )
+
+    # Late fees only accrue in the daily refresh; a row leaving OVERDUE drops them
+    month = CURRENT_MONTH_SQL
+    refresh_row = f"""
+            UPDATE student_fee_balances SET
+                status = {FEE_STATUS_SQL.format(month=month)},
+                months_overdue = {MONTHS_OVERDUE_SQL.format(month=month)},
+                late_fee_accrued = CASE WHEN {OVERDUE_SQL.format(month=month)} THEN late_fee_accrued ELSE 0 END
+            WHERE student_id = new.student_id;"""
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_status_insert
+        AFTER INSERT ON student_fee_balances
+        BEGIN{refresh_row}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_balances_status_update
+        AFTER UPDATE OF course_fee, total_paid, total_discount, admission_date ON student_fee_balances
+        BEGIN{refresh_row}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        UPDATE student_fee_balances SET
+            status = {FEE_STATUS_SQL.format(month=month)},
+            months_overdue = {MONTHS_OVERDUE_SQL.format(month=month)}
+        """
+    )
+
+    # Fee summary pages, all students or one status, latest admissions first
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_student_fee_balances_admitted "
+        "ON student_fee_balances(admission_date, student_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_student_fee_balances_status "
+        "ON student_fee_balances(status, admission_date, student_id)"
+    )
+    # The collections list: longest overdue first
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_student_fee_balances_overdue "
+        "ON student_fee_balances(status, months_overdue, student_id)"
+    )
+
+
+def _add_fee_collections(conn: sqlite3.Connection) -> None:
+    """Payment totals per day and per month, by method and staff member, for collection reports.
+
+    Triggers on fee_payments add and remove each payment in its day's and
+    its month's row, so FeesRepository.get_collections reads at most one
+    row per period, method and handler instead of every payment.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fee_collections (
+            granularity TEXT NOT NULL CHECK(granularity IN ('day', 'month')),
+            period TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            handled_by TEXT NOT NULL,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            amount REAL NOT NULL DEFAULT 0,
+            discount REAL NOT NULL DEFAULT 0,
+            late_fee REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, period, payment_method, handled_by)
+        ) WITHOUT ROWID
+        """
+    )
+
+    # payment_date is client-supplied text; a day is its first 10
+    # characters ("2024-06-01") and a month its first 7
+    periods = (("day", 10), ("month", 7))
+    add_payment = "".join(
+        f"""
+            INSERT INTO fee_collections
+                (granularity, period, payment_method, handled_by, payment_count, amount, discount, late_fee)
+            VALUES (
+                '{granularity}', substr(new.payment_date, 1, {length}), new.payment_method, new.handled_by,
+                1, new.amount, COALESCE(new.discount, 0), COALESCE(new.late_fee, 0)
+            )
+            ON CONFLICT (granularity, period, payment_method, handled_by) DO UPDATE SET
+                payment_count = payment_count + 1,
+                amount = amount + excluded.amount,
+                discount = discount + excluded.discount,
+                late_fee = late_fee + excluded.late_fee;"""
+        for granularity, length in periods
+    )
+    remove_payment = "".join(
+        f"""
+            UPDATE fee_collections SET
+                payment_count = payment_count - 1,
+                amount = amount - old.amount,
+                discount = discount - COALESCE(old.discount, 0),
+                late_fee = late_fee - COALESCE(old.late_fee, 0)
+            WHERE granularity = '{granularity}' AND period = substr(old.payment_date, 1, {length})
+              AND payment_method = old.payment_method AND handled_by = old.handled_by;
+            DELETE FROM fee_collections
+            WHERE granularity = '{granularity}' AND period = substr(old.payment_date, 1, {length})
+              AND payment_method = old.payment_method AND handled_by = old.handled_by
+              AND payment_count <= 0;"""
+        for granularity, length in periods
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_collections_payment_insert
+        AFTER INSERT ON fee_payments
+        BEGIN{add_payment}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_collections_payment_update
+        AFTER UPDATE OF payment_date, payment_method, handled_by, amount, discount, late_fee ON fee_payments
+        BEGIN{remove_payment}{add_payment}
+        END;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS fee_collections_payment_delete
+        AFTER DELETE ON fee_payments
+        BEGIN{remove_payment}
+        END;
+        """
+    )
+
+    for granularity, length in periods:
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO fee_collections
+                (granularity, period, payment_method, handled_by, payment_count, amount, discount, late_fee)
+            SELECT '{granularity}', substr(payment_date, 1, {length}), payment_method, handled_by,
+                   COUNT(*), SUM(amount), COALESCE(SUM(discount), 0), COALESCE(SUM(late_fee), 0)
+            FROM fee_payments
+            GROUP BY 2, 3, 4
+            """
+        )
+
+
+def _add_payment_transaction_index(conn: sqlite3.Connection) -> None:
+    """Lookup of recorded transaction IDs, for de-duplicating bulk imports"""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fee_payments_transaction_id "
+        "ON fee_payments(transaction_id) WHERE transaction_id <> ''"
+    )
+
+
+# Append only: a migration's position is its schema version
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _create_base_schema,
+    _add_fee_payment_discount,
+    _add_admission_exam_columns,
+    _add_enquiry_listing_indexes,
+    _add_admission_listing_indexes,
+    _add_table_versions,
+    _add_student_search,
+    _add_followup_listing_indexes,
+    _add_student_fee_balances,
+    _add_fee_status,
+    _add_fee_collections,
+    _add_payment_transaction_index,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate() -> int:
+    """Apply pending migrations in one transaction and return the schema version.
+
+    The version lives in PRAGMA user_version, so a warm start costs a
+    single pragma read.
+    """
+    conn = get_db_connection()
+    try:
+        version = get_schema_version(conn)
+        if version >= SCHEMA_VERSION:
+            return version
+
+        started = time.perf_counter()
+        # Take the write lock up front so concurrent workers migrate once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = get_schema_version(conn)
+            for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn)
+                print(f"[database] applied migration {target}: {migration.__name__}")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[database] schema at version {SCHEMA_VERSION} ({elapsed:.1f} ms)")
+        return SCHEMA_VERSION
+    finally:
+        conn.close()
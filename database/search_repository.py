@@ -0,0 +1,85 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from .connection import read_connection
+from .mapping import RowMapper
+
+# FTS5 tables created by migration 7; derived data, rebuilt rather than backed up
+SEARCH_INDEXES = ("admissions_fts", "enquiries_fts")
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Ignore the tail of very long queries rather than build huge MATCH expressions
+MAX_SEARCH_TERMS = 8
+
+SEARCH_RESULT = RowMapper(
+    [
+        ("type", "type"),
+        ("id", "id"),
+        ("first_name", "firstName"),
+        ("middle_name", "middleName"),
+        ("last_name", "lastName"),
+        ("mobile_number", "mobileNumber"),
+        ("aadhar_number", "aadharNumber"),
+        ("city", "city"),
+        ("course_name", "courseName"),
+        ("created_at", "createdAt"),
+    ]
+)
+
+_RESULT_COLUMNS = (
+    "t.id, t.first_name, t.middle_name, t.last_name, t.mobile_number, "
+    "t.aadhar_number, t.city, t.course_name, t.created_at"
+)
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 MATCH expression requiring a prefix match of every word in `query`.
+
+    Words are quoted, so FTS5 operators and punctuation typed by users
+    are treated as text. Returns None when there is nothing to match.
+    """
+    terms = re.findall(r"[^\W_]+", query)[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ranked(kind: str, table: str, index: str) -> str:
+    # Every match is scored, then only the best `limit` rows are joined.
+    # bm25() called directly skips the rank column's configuration lookup;
+    # ties go to the newest record.
+    best = (
+        f"SELECT rowid, bm25({index}) AS score FROM {index} WHERE {index} MATCH ? "
+        "ORDER BY score, rowid DESC LIMIT ?"
+    )
+    return (
+        f"SELECT '{kind}' AS type, {_RESULT_COLUMNS}, f.score "
+        f"FROM ({best}) f JOIN {table} t ON t.id = f.rowid"
+    )
+
+
+_SEARCH_SQL = (
+    f"SELECT {SEARCH_RESULT.columns} FROM ("
+    f"{_ranked('admission', 'student_admissions', 'admissions_fts')} UNION ALL "
+    f"{_ranked('enquiry', 'student_enquiries', 'enquiries_fts')}"
+    ") ORDER BY score LIMIT ?"
+)
+
+
+class SearchRepository:
+    @staticmethod
+    def search(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Admissions and enquiries matching every word of `query` as a prefix.
+
+        Matches names, mobile numbers, Aadhaar, city and (for admissions)
+        certificate name, best bm25 rank first.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        with read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SEARCH_SQL, (expression, limit, expression, limit, limit))
+            return SEARCH_RESULT.all(cursor)
@@ -1,12 +1,52 @@
 import os
+import re
 import sqlite3
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 import zipfile
 import shutil
 import tempfile
 
-from .connection import get_db_connection
+from .connection import (close_pool, db_connection, get_effective_pragmas,
+                         get_pool_stats, read_connection)
+from .fee_balances import FeeBalanceRepository
+from .mapping import RowMapper
+from .migrations import migrate
+from .search_repository import SEARCH_INDEXES
+from .table_versions import TableVersionRepository
+
+INSTITUTE_SETTINGS = RowMapper(
+    [
+        ("id", "id"),
+        ("name", "name"),
+        ("center_code", "centerCode"),
+        ("address", "address"),
+        ("phone", "phone"),
+        ("email", "email"),
+        ("website", "website"),
+        ("logo", "logo"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    ]
+)
+
+
+# Dump statements that create or fill a search index, its shadow tables or triggers
+_SEARCH_INDEX_STATEMENT = re.compile(
+    r"^(?:INSERT INTO sqlite_master\(.*?\)VALUES\('table',|INSERT INTO |CREATE TABLE |CREATE TRIGGER )"
+    rf"['\"]?(?:{'|'.join(SEARCH_INDEXES)})\w*['\"]?[\s(,]"
+)
+
+
+def _dump_without_search_indexes(conn: sqlite3.Connection) -> Iterator[str]:
+    """iterdump() minus the FTS5 search indexes.
+
+    The dump replays a virtual table's rows before the table exists, which
+    breaks restores; migrate() recreates and rebuilds the indexes instead.
+    """
+    for statement in conn.iterdump():
+        if not _SEARCH_INDEX_STATEMENT.match(statement):
+            yield statement
 
 
 class SettingsRepository:
@@ -14,85 +54,67 @@ class SettingsRepository:
     @staticmethod
     def get_institute_settings() -> Optional[Dict[str, Any]]:
         """Get institute settings"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id, name, center_code, address, phone, email, website, logo, created_at, updated_at
-            FROM institute_settings
-            ORDER BY id DESC
-            LIMIT 1
-            """
-        )
-
-        row = cursor.fetchone()
-        conn.close()
-
-        if row:
-            return {
-                "id": row[0],
-                "name": row[1],
-                "centerCode": row[2],
-                "address": row[3],
-                "phone": row[4],
-                "email": row[5],
-                "website": row[6],
-                "logo": row[7],
-                "created_at": row[8],
-                "updated_at": row[9],
-            }
-        return None
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                f"""
+                SELECT {INSTITUTE_SETTINGS.columns}
+                FROM institute_settings
+                ORDER BY id DESC
+                LIMIT 1
+                """
+            )
+
+            return INSTITUTE_SETTINGS.one(cursor.fetchone())
 
     @staticmethod
     def update_institute_settings(settings_data: Dict[str, Any]) -> bool:
         """Update institute settings"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+            with db_connection() as conn:
+                cursor = conn.cursor()
 
-            # Check if settings exist
-            cursor.execute("SELECT COUNT(*) FROM institute_settings")
-            count = cursor.fetchone()[0]
-
-            if count == 0:
-                # Insert new settings
-                cursor.execute(
-                    """
-                    INSERT INTO institute_settings (name, center_code, address, phone, email, website, logo)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        settings_data.get("name", ""),
-                        settings_data.get("centerCode", ""),
-                        settings_data.get("address", ""),
-                        settings_data.get("phone", ""),
-                        settings_data.get("email", ""),
-                        settings_data.get("website", ""),
-                        settings_data.get("logo", None),
-                    ),
-                )
-            else:
-                # Update existing settings
-                cursor.execute(
-                    """
-                    UPDATE institute_settings
-                    SET name = ?, center_code = ?, address = ?, phone = ?, email = ?, website = ?, logo = ?
-                    WHERE id = (SELECT id FROM institute_settings ORDER BY id DESC LIMIT 1)
-                    """,
-                    (
-                        settings_data.get("name", ""),
-                        settings_data.get("centerCode", ""),
-                        settings_data.get("address", ""),
-                        settings_data.get("phone", ""),
-                        settings_data.get("email", ""),
-                        settings_data.get("website", ""),
-                        settings_data.get("logo", None),
-                    ),
-                )
+                # Check if settings exist
+                cursor.execute("SELECT COUNT(*) FROM institute_settings")
+                count = cursor.fetchone()[0]
+
+                if count == 0:
+                    # Insert new settings
+                    cursor.execute(
+                        """
+                        INSERT INTO institute_settings (name, center_code, address, phone, email, website, logo)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            settings_data.get("name", ""),
+                            settings_data.get("centerCode", ""),
+                            settings_data.get("address", ""),
+                            settings_data.get("phone", ""),
+                            settings_data.get("email", ""),
+                            settings_data.get("website", ""),
+                            settings_data.get("logo", None),
+                        ),
+                    )
+                else:
+                    # Update existing settings
+                    cursor.execute(
+                        """
+                        UPDATE institute_settings
+                        SET name = ?, center_code = ?, address = ?, phone = ?, email = ?, website = ?, logo = ?
+                        WHERE id = (SELECT id FROM institute_settings ORDER BY id DESC LIMIT 1)
+                        """,
+                        (
+                            settings_data.get("name", ""),
+                            settings_data.get("centerCode", ""),
+                            settings_data.get("address", ""),
+                            settings_data.get("phone", ""),
+                            settings_data.get("email", ""),
+                            settings_data.get("website", ""),
+                            settings_data.get("logo", None),
+                        ),
+                    )
 
-            conn.commit()
-            conn.close()
             return True
         except Exception as e:
             print(f"Error updating settings: {e}")
@@ -102,9 +124,6 @@ class SettingsRepository:
     def get_database_stats() -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
             # Get database file size
             db_file = "student_data.db"
             db_size = os.path.getsize(
@@ -120,13 +139,15 @@ class SettingsRepository:
                 "institute_settings",
             ]
 
-            for table in tables:
-                try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    count = cursor.fetchone()[0]
-                    total_records += count
-                except:
-                    pass
+            with read_connection() as conn:
+                cursor = conn.cursor()
+                for table in tables:
+                    try:
+                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                        count = cursor.fetchone()[0]
+                        total_records += count
+                    except:
+                        pass
 
             # Get last backup info (simulated - you can implement actual backup tracking)
             last_backup = None
@@ -167,13 +188,13 @@ class SettingsRepository:
                             }
                         )
 
-            conn.close()
-
             return {
                 "lastBackup": last_backup,
                 "databaseSize": db_size,
                 "totalRecords": total_records,
                 "backupHistory": backup_history,
+                "connectionPool": get_pool_stats(),
+                "connectionSettings": get_effective_pragmas(),
             }
         except Exception as e:
             print(f"Error getting database stats: {e}")
@@ -196,11 +217,10 @@ class SettingsRepository:
             backup_path = os.path.join(backup_dir, backup_filename)
 
             # Create SQL dump
-            conn = get_db_connection()
-            with open(backup_path, "w") as f:
-                for line in conn.iterdump():
-                    f.write("%s\n" % line)
-            conn.close()
+            with read_connection() as conn:
+                with open(backup_path, "w") as f:
+                    for line in _dump_without_search_indexes(conn):
+                        f.write("%s\n" % line)
 
             # Create zip containing SQL and uploads
             zip_filename = f"edumanage_backup_{timestamp}.zip"
@@ -256,9 +276,13 @@ class SettingsRepository:
                 if not sql_file:
                     print("No SQL file found in backup zip!")
                     return False
-                # Restore DB from SQL file
-                if os.path.exists(db_path):
-                    os.remove(db_path)
+                # Restore DB from SQL file; pooled connections still
+                # point at the old file, so drop them first
+                versions = TableVersionRepository.get_all()
+                close_pool()
+                for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+                    if os.path.exists(path):
+                        os.remove(path)
                 conn = sqlite3.connect(db_path)
                 cursor = conn.cursor()
                 with open(sql_file, "r", encoding="utf-8") as f:
@@ -266,6 +290,12 @@ class SettingsRepository:
                 cursor.executescript(sql_script)
                 conn.commit()
                 conn.close()
+                # Dumps don't carry PRAGMA user_version, so re-check the schema
+                migrate()
+                # Invalidate ETags issued against the replaced data
+                TableVersionRepository.advance_past(versions)
+                # Statuses in the backup are as of the day it was taken
+                FeeBalanceRepository.refresh_status()
                 # Restore uploads if present
                 extracted_uploads = os.path.join(tmpdir, 'uploads')
                 if os.path.exists(extracted_uploads):
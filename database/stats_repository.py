@@ -1,45 +1,43 @@
 from typing import Any, Dict
 
-from .connection import get_db_connection
+from .connection import read_connection
 
 
 class StatsRepository:
     @staticmethod
     def get_stats() -> Dict[str, Any]:
         """Get basic statistics"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Count enquiries
-        cursor.execute("SELECT COUNT(*) FROM student_enquiries")
-        total_enquiries = cursor.fetchone()[0]
-
-        # Count admissions
-        cursor.execute("SELECT COUNT(*) FROM student_admissions")
-        total_admissions = cursor.fetchone()[0]
-
-        # Get course-wise stats
-        cursor.execute(
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            # Count enquiries
+            cursor.execute("SELECT COUNT(*) FROM student_enquiries")
+            total_enquiries = cursor.fetchone()[0]
+
+            # Count admissions
+            cursor.execute("SELECT COUNT(*) FROM student_admissions")
+            total_admissions = cursor.fetchone()[0]
+
+            # Get course-wise stats
+            cursor.execute(
+                """
+                SELECT course_name, COUNT(*) as count
+                FROM student_enquiries
+                GROUP BY course_name
+                ORDER BY count DESC
             """
-            SELECT course_name, COUNT(*) as count
-            FROM student_enquiries
-            GROUP BY course_name
-            ORDER BY count DESC
-        """
-        )
-        enquiry_courses = cursor.fetchall()
-
-        cursor.execute(
+            )
+            enquiry_courses = cursor.fetchall()
+
+            cursor.execute(
+                """
+                SELECT course_name, COUNT(*) as count
+                FROM student_admissions
+                GROUP BY course_name
+                ORDER BY count DESC
             """
-            SELECT course_name, COUNT(*) as count
-            FROM student_admissions
-            GROUP BY course_name
-            ORDER BY count DESC
-        """
-        )
-        admission_courses = cursor.fetchall()
-
-        conn.close()
+            )
+            admission_courses = cursor.fetchall()
 
         return {
             "total_enquiries": total_enquiries,
@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, Mapping
+
+from .connection import db_connection, read_connection
+
+
+class TableVersionRepository:
+    """Change counters kept in table_versions by the triggers from migration 6"""
+
+    @staticmethod
+    def get(tables: Iterable[str]) -> Dict[str, int]:
+        """Current version of each named table (0 for untracked names)"""
+        tables = tuple(tables)
+        with read_connection() as conn:
+            rows = conn.execute(
+                "SELECT table_name, version FROM table_versions "
+                f"WHERE table_name IN ({', '.join('?' * len(tables))})",
+                tables,
+            ).fetchall()
+        versions = dict.fromkeys(tables, 0)
+        versions.update(rows)
+        return versions
+
+    @staticmethod
+    def get_all() -> Dict[str, int]:
+        with read_connection() as conn:
+            return dict(conn.execute("SELECT table_name, version FROM table_versions").fetchall())
+
+    @staticmethod
+    def advance_past(previous: Mapping[str, int]) -> None:
+        """Move every counter beyond `previous`.
+
+        A restored database brings back older counters; without this, a
+        version a client already holds could name different data.
+        """
+        with db_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO table_versions (table_name, version) VALUES (?, ? + 1)
+                ON CONFLICT(table_name) DO UPDATE SET version = MAX(version + 1, excluded.version)
+                """,
+                list(previous.items()),
+            )
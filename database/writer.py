@@ -0,0 +1,182 @@
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from time import perf_counter
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from config import DB_WRITE_BATCH_MAX, DB_WRITE_BATCH_MS, DB_WRITE_QUEUE, DB_WRITE_TIMEOUT
+from .connection import current_unit_of_work, db_connection, get_db_connection, run_commit_callbacks
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+class WriteJob:
+    __slots__ = ("func", "args", "kwargs", "future")
+
+    def __init__(self, func: Callable[..., Any], args: Tuple[Any, ...], kwargs: dict):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+
+class WriteQueue:
+    """Runs write jobs on a single thread, committing them in groups.
+
+    The writer takes the first queued job plus everything queued behind
+    it, waiting up to `batch_window_ms` for more (capped at `max_batch`),
+    and runs them all in one transaction. Each job runs in its own savepoint, so a failing
+    job only fails its own future; the rest commit together, and their
+    futures resolve only once that commit has succeeded.
+    """
+
+    def __init__(self, batch_window_ms: float = DB_WRITE_BATCH_MS, max_batch: int = DB_WRITE_BATCH_MAX):
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.pid = os.getpid()
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+
+        # Metrics
+        self.batches = 0
+        self.jobs = 0
+
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        job = WriteJob(func, args, kwargs)
+        self._queue.put(job)
+        return job.future
+
+    def stop(self) -> None:
+        """Finish queued jobs, then stop the writer thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self, first: WriteJob) -> Tuple[List[WriteJob], bool]:
+        batch = [first]
+        deadline = perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            batch, stopping = self._collect(job)
+            try:
+                self._commit(batch)
+            except BaseException as e:
+                # Whatever went wrong, no caller is left waiting and the
+                # writer carries on with the next batch
+                print(f"[database] write batch failed: {e!r}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+
+    def _commit(self, batch: List[WriteJob]) -> None:
+        done = []
+        try:
+            # A fresh checkout per batch picks up pool resets (e.g. after a restore)
+            conn = get_db_connection()
+        except sqlite3.Error as e:
+            for job in batch:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(e)
+            return
+
+        # Repository calls made by the jobs join this transaction
+        token = current_unit_of_work.set(conn)
+        try:
+            for job in batch:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db_connection():
+                        result = job.func(*job.args, **job.kwargs)
+                except Exception as e:
+                    job.future.set_exception(e)
+                else:
+                    done.append((job, result))
+
+            try:
+                if conn.in_transaction:
+                    conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                for job, _ in done:
+                    job.future.set_exception(e)
+            else:
+                # Before the futures resolve, so callers see their effects
+                run_commit_callbacks(conn, True)
+                for job, result in done:
+                    job.future.set_result(result)
+                self.batches += 1
+                self.jobs += len(done)
+        finally:
+            current_unit_of_work.reset(token)
+            run_commit_callbacks(conn, False)
+            conn.close()
+
+
+_write_queue: Optional[WriteQueue] = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteQueue:
+    """Get the process-wide write queue, starting its thread on first use"""
+    global _write_queue
+    if _write_queue is None or _write_queue.pid != os.getpid():
+        with _write_queue_lock:
+            if _write_queue is None or _write_queue.pid != os.getpid():
+                _write_queue = WriteQueue()
+    return _write_queue
+
+
+def shutdown_write_queue() -> None:
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is not None and _write_queue.pid == os.getpid():
+            _write_queue.stop()
+        _write_queue = None
+
+
+def submit_write(func: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+    """Queue a write for the writer thread.
+
+    Runs inline instead when the queue is disabled, or when the caller
+    is already inside a unit of work (including the writer itself), so
+    the write stays in that transaction.
+    """
+    if DB_WRITE_QUEUE and current_unit_of_work.get() is None:
+        return get_write_queue().submit(func, *args, **kwargs)
+
+    future: Future = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def write(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a write through the queue and wait for its commit.
+
+    Raises concurrent.futures.TimeoutError after DB_WRITE_TIMEOUT
+    seconds; the job may still commit later.
+    """
+    return submit_write(func, *args, **kwargs).result(timeout=DB_WRITE_TIMEOUT or None)
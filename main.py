@@ -10,8 +10,13 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import Optional
 
 # Import database initialization
-from database.connection import (init_courses_table, init_database,
-                                 init_followups_table, init_fee_payments_table, init_settings_table, init_attendance_table, init_documents_table)
+from database.async_repository import shutdown_db_executor
+from config import FEE_STATUS_REFRESH
+from database.connection import check_pragmas
+from database.fee_balances import start_fee_status_refresher, stop_fee_status_refresher
+from database.migrations import migrate
+from database.writer import shutdown_write_queue
+from metrics import HTTPMetricsMiddleware
 from routers.admission import router as admission_router
 from routers.courses import router as course_router
 # Import routers
@@ -23,6 +28,9 @@ from routers.settings import router as settings_router
 from routers.stats import router as stats_router
 from routers.attendance import router as attendance_router
 from routers.documents import router as documents_router
+from routers.metrics import router as metrics_router
+from routers.export import router as export_router
+from routers.search import router as search_router
 
 UPLOAD_FOLDER = "uploads"
 DOCUMENTS_FOLDER = "uploads/documents"
@@ -44,6 +52,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms, served at /api/metrics
+app.add_middleware(HTTPMetricsMiddleware)
+
 # Mount static files to serve uploaded images
 app.mount("/uploads", StaticFiles(directory=UPLOAD_FOLDER), name="uploads")
 
@@ -58,19 +69,27 @@ app.include_router(followups_router)
 app.include_router(settings_router)
 app.include_router(attendance_router)
 app.include_router(documents_router)
+app.include_router(metrics_router)
+app.include_router(export_router)
+app.include_router(search_router)
 
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
-    init_database()
-    init_courses_table()
-    init_followups_table()
-    init_fee_payments_table()
-    init_settings_table()
-    init_attendance_table()
-    init_documents_table()
+    """Bring the database schema up to date on startup"""
+    migrate()
+    check_pragmas()
+    if FEE_STATUS_REFRESH:
+        start_fee_status_refresher()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let in-flight database calls and queued writes finish"""
+    stop_fee_status_refresher()
+    shutdown_db_executor()
+    shutdown_write_queue()
 
 
 # Pydantic models for auth
@@ -147,15 +166,13 @@ def change_password(
     if not user or not verify_password(old_password, hashed_pw):
         raise HTTPException(status_code=401, detail="Incorrect old password")
     # Hash new password and update in DB
-    from database.connection import get_db_connection
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE users SET hashed_password = ? WHERE username = ?",
-        (hash_password(new_password), current_user.username)
-    )
-    conn.commit()
-    conn.close()
+    from database.connection import db_connection
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET hashed_password = ? WHERE username = ?",
+            (hash_password(new_password), current_user.username)
+        )
     return {"detail": "Password changed successfully"}
 
 
@@ -0,0 +1,137 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from database.connection import get_pool_stats
+from database.instrumentation import query_stats
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by a fixed set of labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, "histogram", self.help_text)
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in sorted(series):
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                lines.append(f"{self.name}_bucket{_labels(**labels, le=repr(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(**labels, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_labels(**labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(**labels)} {count}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware that times every HTTP request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route on the scope; label by its
+            # template so /api/enquiries/{id} is one series, not one per id
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration.observe(
+                perf_counter() - started, scope["method"], route, str(status)
+            )
+
+
+def _query_metrics() -> List[str]:
+    statements = query_stats.snapshot()
+    duration = _header("db_query_duration_seconds", "summary", "SQL statement latency from execute to last fetch")
+    rows = _header("db_query_rows_total", "counter", "Rows returned (SELECT) or affected (DML)")
+    errors = _header("db_query_errors_total", "counter", "Statements that raised sqlite3.Error")
+    for item in statements:
+        labels = {"statement": item["statement"], "caller": item["caller"]}
+        for q, value in item["quantiles"].items():
+            duration.append(f"db_query_duration_seconds{_labels(**labels, quantile=str(q))} {value}")
+        duration.append(f"db_query_duration_seconds_sum{_labels(**labels)} {item['total_seconds']}")
+        duration.append(f"db_query_duration_seconds_count{_labels(**labels)} {item['count']}")
+        rows.append(f"db_query_rows_total{_labels(**labels)} {item['rows']}")
+        errors.append(f"db_query_errors_total{_labels(**labels)} {item['errors']}")
+    return duration + rows + errors
+
+
+def _pool_metrics() -> List[str]:
+    pools = get_pool_stats()
+    connections = _header("db_pool_connections", "gauge", "Pooled SQLite connections by state")
+    acquired = _header("db_pool_acquired_total", "counter", "Connections checked out of the pool")
+    waits = _header("db_pool_waits_total", "counter", "Checkouts that had to wait for a free connection")
+    timeouts = _header("db_pool_timeouts_total", "counter", "Checkouts that gave up waiting")
+    for pool, stats in pools.items():
+        for state in ("idle", "in_use"):
+            connections.append(f"db_pool_connections{_labels(pool=pool, state=state)} {stats[state]}")
+        acquired.append(f"db_pool_acquired_total{_labels(pool=pool)} {stats['acquired']}")
+        waits.append(f"db_pool_waits_total{_labels(pool=pool)} {stats['waits']}")
+        timeouts.append(f"db_pool_timeouts_total{_labels(pool=pool)} {stats['timeouts']}")
+    return connections + acquired + waits + timeouts
+
+
+def render_metrics() -> str:
+    """All metrics for this worker process in Prometheus text format"""
+    lines = http_request_duration.render() + _query_metrics() + _pool_metrics()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,19 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, for payloads that are already JSON-ready.
+
+    Returning one from an endpoint skips FastAPI's own serialization
+    (jsonable_encoder, or response-model validation and dumping), which
+    repository output (dicts and lists of str, int, float and None) never
+    needs. List endpoints use it; routes with dependencies that set
+    headers (conditional_get) pass `headers=response.headers`, since
+    FastAPI only merges those into responses it builds itself.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,14 +1,24 @@
-from typing import Any, Dict, Optional
+from datetime import date
+from typing import Any, Dict, Literal, Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, ValidationError
 
+from conditional import conditional_get
 from database.admission_repository import AdmissionRepository
+from database.async_repository import AsyncRepository, async_unit_of_work
+from database.mapping import UnknownField, parse_fields
+from database.pagination import MAX_PAGE_SIZE, InvalidCursor
 from file_handler import FileHandler
 from models import StudentAdmission
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["admissions"])
 
+# Async endpoints must not run sqlite3 calls on the event loop
+async_admissions = AsyncRepository(AdmissionRepository)
+
 
 class ExamResult(BaseModel):
     exam_date: str
@@ -102,8 +112,11 @@ async def create_admission(
         )
 
         # Save uploaded files
-        photo_filename, signature_filename = FileHandler.save_admission_files(
-            admission_model.mobileNumber, photo, signature
+        photo_filename, signature_filename = await run_in_threadpool(
+            FileHandler.save_admission_files,
+            admission_model.mobileNumber,
+            photo,
+            signature,
         )
 
         # Prepare admission data
@@ -132,8 +145,14 @@ async def create_admission(
             "signatureFilename": signature_filename,
         }
 
-        # Save to database
-        admission_id = AdmissionRepository.create(admission_data)
+        # Save to database; drop the uploaded files if the row isn't written
+        try:
+            async with async_unit_of_work():
+                admission_id = await async_admissions.create(admission_data)
+        except Exception:
+            for filename in (photo_filename, signature_filename):
+                await run_in_threadpool(FileHandler.delete_file, filename)
+            raise
 
         return {
             "message": "Admission completed successfully",
@@ -180,7 +199,7 @@ async def update_admission(
     """Update an existing admission with optional file uploads"""
     try:
         # Get existing admission to check if it exists and get current file names
-        existing_admission = AdmissionRepository.get_by_id(admission_id)
+        existing_admission = await async_admissions.get_by_id(admission_id)
         if not existing_admission:
             raise HTTPException(status_code=404, detail="Admission not found")
 
@@ -213,7 +232,8 @@ async def update_admission(
         signature_filename = None
 
         if photo or signature:
-            photo_filename, signature_filename = FileHandler.update_admission_files(
+            photo_filename, signature_filename = await run_in_threadpool(
+                FileHandler.update_admission_files,
                 mobile_number=admission_model.mobileNumber,
                 photo=photo,
                 signature=signature,
@@ -252,7 +272,7 @@ async def update_admission(
             admission_data["signatureFilename"] = signature_filename
 
         # Update in database
-        success = AdmissionRepository.update(admission_id, admission_data)
+        success = await async_admissions.update(admission_id, admission_data)
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update admission")
@@ -275,17 +295,51 @@ async def update_admission(
         )
 
 
-@router.get("/admissions")
-def get_all_admissions() -> Dict[str, Any]:
-    """Get all admissions (for admin purposes)"""
+@router.get("/admissions", dependencies=[conditional_get("student_admissions")])
+def get_all_admissions(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "name"] = "id",
+    course_name: Optional[str] = None,
+    timing: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    result: Optional[Literal["pass", "fail", "pending"]] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated response keys to return"),
+) -> FastJSONResponse:
+    """List admissions a page at a time; full records come from /admission/{id}"""
     try:
-        admissions = AdmissionRepository.get_all()
-        return {"admissions": admissions, "total": len(admissions)}
+        admissions, next_cursor = AdmissionRepository.get_page(
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            course_name=course_name,
+            timing=timing,
+            date_from=date_from,
+            date_to=date_to,
+            result=result,
+            fields=parse_fields(fields),
+        )
+        # Counting scans every match, so only the first page pays for it
+        total = None if cursor else AdmissionRepository.count(
+            course_name=course_name,
+            timing=timing,
+            date_from=date_from,
+            date_to=date_to,
+            result=result,
+        )
+        return FastJSONResponse(
+            {"admissions": admissions, "total": total, "next_cursor": next_cursor},
+            headers=response.headers,
+        )
+    except (InvalidCursor, UnknownField) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/admission/{admission_id}")
+@router.get("/admission/{admission_id}", dependencies=[conditional_get("student_admissions")])
 def get_admission(admission_id: int) -> Dict[str, Any]:
     """Get a specific admission by ID"""
     try:
@@ -2,16 +2,18 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 from database.attendance_repository import AttendanceRepository
 from database.admission_repository import AdmissionRepository
+from database.writer import write
+from responses import FastJSONResponse
 from datetime import date
 
 router = APIRouter(prefix="/api", tags=["attendance"])
 
 @router.get("/attendance/students")
-def get_students_by_batch(batch_timing: str) -> Dict[str, Any]:
+def get_students_by_batch(batch_timing: str) -> FastJSONResponse:
     """Get all students in a batch (with photo)"""
     try:
         students = AttendanceRepository.get_students_by_batch(batch_timing)
-        return {"students": students, "total": len(students), "status": "success"}
+        return FastJSONResponse({"students": students, "total": len(students), "status": "success"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching students: {str(e)}")
 
@@ -19,17 +21,17 @@ def get_students_by_batch(batch_timing: str) -> Dict[str, Any]:
 def mark_attendance(records: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Bulk mark attendance for a list of students for a given date and batch."""
     try:
-        AttendanceRepository.mark_attendance(records)
+        write(AttendanceRepository.mark_attendance, records)
         return {"message": "Attendance marked successfully", "status": "success"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error marking attendance: {str(e)}")
 
 @router.get("/attendance/by-date")
-def get_attendance_by_date_batch(date_str: str, batch_timing: str) -> Dict[str, Any]:
+def get_attendance_by_date_batch(date_str: str, batch_timing: str) -> FastJSONResponse:
     """Get attendance for all students for a given date and batch."""
     try:
         records = AttendanceRepository.get_attendance_by_date_batch(date_str, batch_timing)
-        return {"attendance": records, "total": len(records), "status": "success"}
+        return FastJSONResponse({"attendance": records, "total": len(records), "status": "success"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching attendance: {str(e)}")
 
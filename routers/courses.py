@@ -1,9 +1,11 @@
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 
+from conditional import conditional_get
 from database.courses_repository import CourseRepository
 from models import Course, CourseUpdate
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["courses"])
 
@@ -28,10 +30,11 @@ def create_course(course: Course) -> Dict[str, Any]:
             status_code=500, detail=f"Error creating course: {str(e)}")
 
 
-@router.get("/courses", response_model=Dict[str, Any])
+@router.get("/courses", dependencies=[conditional_get("courses")])
 def get_all_courses(
+    response: Response,
     search: Optional[str] = Query(None, description="Search courses by name")
-) -> Dict[str, Any]:
+) -> FastJSONResponse:
     """Get all courses with optional search"""
     try:
         if search:
@@ -39,13 +42,18 @@ def get_all_courses(
         else:
             courses = CourseRepository.get_all()
 
-        return {"courses": courses, "total": len(courses), "status": "success"}
+        return FastJSONResponse(
+            {"courses": courses, "total": len(courses), "status": "success"},
+            headers=response.headers,
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching courses: {str(e)}")
 
 
-@router.get("/courses/{course_id}", response_model=Dict[str, Any])
+@router.get(
+    "/courses/{course_id}", response_model=Dict[str, Any], dependencies=[conditional_get("courses")]
+)
 def get_course(course_id: int) -> Dict[str, Any]:
     """Get a specific course by ID"""
     try:
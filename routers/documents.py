@@ -1,16 +1,24 @@
 import os
 import shutil
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 
+from database.async_repository import AsyncRepository, async_unit_of_work
 from database.documents_repository import DocumentsRepository
 from database.admission_repository import AdmissionRepository
+from database.mapping import UnknownField, parse_fields
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["documents"])
 
+# Async endpoints must not run sqlite3 calls on the event loop
+async_admissions = AsyncRepository(AdmissionRepository)
+async_documents = AsyncRepository(DocumentsRepository)
+
 DOCUMENTS_FOLDER = "uploads/documents"
 os.makedirs(DOCUMENTS_FOLDER, exist_ok=True)
 
@@ -56,6 +64,11 @@ def save_document_file(student_id: int, document_type: str, file: UploadFile) ->
     return filename, file.filename
 
 
+def _remove_file(file_path: str) -> None:
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+
 @router.post("/documents/upload")
 async def upload_document(
     student_id: int = Form(...),
@@ -65,27 +78,21 @@ async def upload_document(
 ) -> Dict[str, Any]:
     """Upload a document for a student"""
     try:
-        # Validate student exists
-        student = AdmissionRepository.get_by_id(student_id)
-        if not student:
-            raise HTTPException(status_code=404, detail="Student not found")
-        
         # Validate file
         validate_file(file)
-        
+
         # Validate document type
         valid_types = ["SIGNED_ADMISSION_FORM", "IDENTITY_PROOF", "ADDRESS_PROOF", "EDUCATIONAL_CERTIFICATE", "FINAL_CERTIFICATE", "OTHER"]
         if document_type not in valid_types:
             raise HTTPException(status_code=400, detail="Invalid document type")
-        
-        # Save file
-        filename, original_filename = save_document_file(student_id, document_type, file)
-        
-        # Get file size
+
+        # Save file and get its size before taking a database connection
+        filename, original_filename = await run_in_threadpool(
+            save_document_file, student_id, document_type, file
+        )
         file_path = os.path.join(DOCUMENTS_FOLDER, filename)
-        file_size = os.path.getsize(file_path)
-        
-        # Save document record
+        file_size = await run_in_threadpool(os.path.getsize, file_path)
+
         document_data = {
             "student_id": student_id,
             "document_type": document_type,
@@ -96,9 +103,19 @@ async def upload_document(
             "status": "UPLOADED",
             "notes": notes,
         }
-        
-        document_id = DocumentsRepository.create_document(document_data)
-        
+
+        # The student check and the insert share one short unit; drop the
+        # saved file if the row isn't written
+        try:
+            async with async_unit_of_work():
+                student = await async_admissions.get_by_id(student_id)
+                if not student:
+                    raise HTTPException(status_code=404, detail="Student not found")
+                document_id = await async_documents.create_document(document_data)
+        except Exception:
+            await run_in_threadpool(_remove_file, file_path)
+            raise
+
         return {
             "message": "Document uploaded successfully",
             "document_id": document_id,
@@ -113,15 +130,19 @@ async def upload_document(
 
 
 @router.get("/documents/uploaded")
-def get_uploaded_documents() -> Dict[str, Any]:
+def get_uploaded_documents(
+    fields: Optional[str] = Query(None, description="Comma-separated response keys to return"),
+) -> FastJSONResponse:
     """Get all uploaded documents"""
     try:
-        documents = DocumentsRepository.get_all_documents()
-        return {
+        documents = DocumentsRepository.get_all_documents(parse_fields(fields))
+        return FastJSONResponse({
             "documents": documents,
             "total": len(documents),
             "status": "success",
-        }
+        })
+    except UnknownField as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching documents: {str(e)}")
 
@@ -1,10 +1,15 @@
-from typing import Any, Dict
+from datetime import date
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import ValidationError
 
+from conditional import conditional_get
 from database.enquiry_repository import EnquiryRepository
+from database.mapping import UnknownField, parse_fields
+from database.pagination import MAX_PAGE_SIZE, InvalidCursor
 from models import StudentEnquiry
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["enquiries"])
 
@@ -30,12 +35,49 @@ def create_enquiry(enquiry: StudentEnquiry) -> Dict[str, Any]:
         }
 
 
-@router.get("/enquiries")
-def get_all_enquiries() -> Dict[str, Any]:
-    """Get all enquiries (for admin purposes)"""
+@router.get("/enquiries", dependencies=[conditional_get("student_enquiries")])
+def get_all_enquiries(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    course_name: Optional[str] = None,
+    timing: Optional[str] = None,
+    handled_by: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    fields: Optional[str] = Query(None, description="Comma-separated response keys to return"),
+) -> FastJSONResponse:
+    """Get enquiries newest first, one page at a time.
+
+    Pass the returned next_cursor back as `cursor` for the following page;
+    it is null on the last page. `total` counts every enquiry matching the
+    filters; it is sent with the first page only and null after that.
+    """
     try:
-        enquiries = EnquiryRepository.get_all()
-        return {"enquiries": enquiries, "total": len(enquiries)}
+        enquiries, next_cursor = EnquiryRepository.get_page(
+            limit=limit,
+            cursor=cursor,
+            course_name=course_name,
+            timing=timing,
+            handled_by=handled_by,
+            date_from=date_from,
+            date_to=date_to,
+            fields=parse_fields(fields),
+        )
+        # Counting scans every match, so only the first page pays for it
+        total = None if cursor else EnquiryRepository.count(
+            course_name=course_name,
+            timing=timing,
+            handled_by=handled_by,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        return FastJSONResponse(
+            {"enquiries": enquiries, "total": total, "next_cursor": next_cursor},
+            headers=response.headers,
+        )
+    except (InvalidCursor, UnknownField) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Iterator, Literal
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from database.export_repository import ExportRepository
+
+router = APIRouter(prefix="/api", tags=["export"])
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    # Nested values (payment denominations) go into one cell as JSON
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+def _csv_chunks(entity: str) -> Iterator[str]:
+    columns = ExportRepository.columns(entity)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in ExportRepository.iter_chunks(entity):
+        writer.writerows([_csv_value(row[key]) for key in columns] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(entity: str) -> Iterator[str]:
+    for rows in ExportRepository.iter_chunks(entity):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+
+
+@router.get("/export/{entity}")
+def export_entity(
+    entity: Literal["enquiries", "admissions", "payments"],
+    format: Literal["csv", "ndjson"] = "csv",
+) -> StreamingResponse:
+    """Stream a whole table as CSV or NDJSON without loading it into memory"""
+    try:
+        chunks = _csv_chunks(entity) if format == "csv" else _ndjson_chunks(entity)
+        filename = f"{entity}-{date.today().isoformat()}.{format}"
+        return StreamingResponse(
+            chunks,
+            media_type=MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting {entity}: {str(e)}")
@@ -1,31 +1,102 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import csv
+import io
+from datetime import date
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from pydantic import ValidationError
+from typing import Dict, Any, Iterator, List, Literal, Optional, Tuple
 from models import PaymentCreate
 from database.fees_repository import FeesRepository
+from database.pagination import MAX_PAGE_SIZE, InvalidCursor
+from database.writer import write
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["fees"])
 
+# Values the fee_payments CHECK constraint accepts
+PAYMENT_METHODS = ("CASH", "CARD", "UPI", "BANK_TRANSFER", "CHEQUE")
+
+# CSV import: columns read from the file, those every row needs, and how
+# many rows share one executemany and commit
+IMPORT_COLUMNS = (
+    "student_id", "amount", "payment_date", "payment_method", "transaction_id", "notes",
+    "late_fee", "discount", "handled_by", "cheque_number", "bank_name",
+)
+IMPORT_REQUIRED_COLUMNS = ("student_id", "amount", "payment_date", "payment_method")
+IMPORT_CHUNK_SIZE = 500
+
+
+def _payment_data(payment: PaymentCreate) -> Dict[str, Any]:
+    """Repository payload for a validated payment"""
+    return {
+        "student_id": payment.student_id,
+        "amount": payment.amount,
+        "payment_date": payment.payment_date,
+        "payment_method": payment.payment_method,
+        "transaction_id": payment.transaction_id or "",
+        "notes": payment.notes or "",
+        "late_fee": payment.late_fee or 0,
+        "discount": payment.discount or 0,
+        "handled_by": payment.handled_by or "System User",
+        "denominations": [d.dict() for d in payment.denominations] if payment.denominations else [],
+        "cheque_number": payment.cheque_number,
+        "bank_name": payment.bank_name,
+    }
+
+
+def _import_errors(payment: PaymentCreate) -> List[str]:
+    """Checks the fee_payments constraints would otherwise fail a whole chunk on"""
+    errors = []
+    if payment.amount <= 0:
+        errors.append("amount: must be greater than 0")
+    if payment.payment_method not in PAYMENT_METHODS:
+        errors.append(f"payment_method: must be one of {', '.join(PAYMENT_METHODS)}")
+    # fromisoformat also takes forms like 20240601 and 2024-W22-6, which
+    # would be stored as-is and break the substr() periods in fee_collections
+    try:
+        valid_date = date.fromisoformat(payment.payment_date).isoformat() == payment.payment_date
+    except ValueError:
+        valid_date = False
+    if not valid_date:
+        errors.append("payment_date: must be a date (YYYY-MM-DD)")
+    return errors
+
+
+def _read_payments(
+    file: UploadFile, handled_by: Optional[str]
+) -> Iterator[Tuple[int, Dict[str, str], Optional[PaymentCreate], List[str]]]:
+    """Parse and validate a payments CSV one row at a time.
+
+    Yields (line number, raw values, payment or None, errors). Blank
+    cells count as missing, so optional columns take their defaults.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    missing = [column for column in IMPORT_REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"CSV is missing columns: {', '.join(missing)}")
+
+    for record in reader:
+        values = {
+            column: value.strip()
+            for column, value in record.items()
+            if column in IMPORT_COLUMNS and value and value.strip()
+        }
+        if handled_by and "handled_by" not in values:
+            values["handled_by"] = handled_by
+        try:
+            payment = PaymentCreate(**values)
+        except ValidationError as e:
+            errors = [f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()]
+            yield reader.line_num, values, None, errors
+            continue
+        errors = _import_errors(payment)
+        yield reader.line_num, values, None if errors else payment, errors
+
 
 @router.post("/fees/payment")
 def create_payment(payment: PaymentCreate) -> Dict[str, Any]:
     """Create a new payment record"""
     try:
-        payment_data = {
-            "student_id": payment.student_id,
-            "amount": payment.amount,
-            "payment_date": payment.payment_date,
-            "payment_method": payment.payment_method,
-            "transaction_id": payment.transaction_id or "",
-            "notes": payment.notes or "",
-            "late_fee": payment.late_fee or 0,
-            "discount": payment.discount or 0,
-            "handled_by": payment.handled_by or "System User",
-            "denominations": [d.dict() for d in payment.denominations] if payment.denominations else [],
-            "cheque_number": getattr(payment, "cheque_number", ""),
-            "bank_name": getattr(payment, "bank_name", ""),
-        }
-
-        payment_id = FeesRepository.create_payment(payment_data)
+        payment_id = write(FeesRepository.create_payment, _payment_data(payment))
 
         return {
             "message": "Payment recorded successfully",
@@ -36,34 +107,185 @@ def create_payment(payment: PaymentCreate) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error recording payment: {str(e)}")
 
 
+@router.post("/fees/import")
+def import_payments(
+    file: UploadFile = File(..., description="CSV with a header row naming PaymentCreate fields"),
+    handled_by: Optional[str] = Form(None, description="Staff member for rows that don't name one"),
+) -> Dict[str, Any]:
+    """Import payments from a CSV file, such as a bank settlement file.
+
+    Rows are validated against PaymentCreate and inserted IMPORT_CHUNK_SIZE
+    at a time, each chunk in one transaction. Rows whose transaction_id is
+    already recorded are skipped. The report lists every row that was not
+    imported with its line number and reasons.
+    """
+    imported = 0
+    report: List[Dict[str, Any]] = []
+
+    def flush(chunk: List[Tuple[int, Dict[str, str], PaymentCreate]]) -> int:
+        skipped = write(FeesRepository.create_payments, [_payment_data(payment) for _, _, payment in chunk])
+        for (line, values, _), reason in zip(chunk, skipped):
+            if reason:
+                report.append({
+                    "row": line,
+                    "transaction_id": values.get("transaction_id", ""),
+                    "errors": [reason],
+                })
+        return skipped.count(None)
+
+    try:
+        chunk: List[Tuple[int, Dict[str, str], PaymentCreate]] = []
+        for line, values, payment, errors in _read_payments(file, handled_by):
+            if payment is None:
+                report.append({"row": line, "transaction_id": values.get("transaction_id", ""), "errors": errors})
+                continue
+            chunk.append((line, values, payment))
+            if len(chunk) == IMPORT_CHUNK_SIZE:
+                imported += flush(chunk)
+                chunk = []
+        if chunk:
+            imported += flush(chunk)
+    except HTTPException:
+        raise
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not read CSV ({imported} payments imported before the error): {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error importing payments ({imported} imported before the error): {str(e)}",
+        )
+
+    report.sort(key=lambda entry: entry["row"])
+    return {
+        "message": f"Imported {imported} payments, skipped {len(report)} rows",
+        "imported": imported,
+        "skipped": len(report),
+        "errors": report,
+        "status": "success",
+    }
+
+
 @router.get("/fees")
-def get_fee_summary() -> Dict[str, Any]:
-    """Get fee summary for all students"""
+def get_fee_summary(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[Literal["PAID", "PARTIAL", "PENDING", "OVERDUE"]] = None,
+) -> FastJSONResponse:
+    """Get the fee summary, latest admissions first, one page at a time"""
     try:
-        fee_summary = FeesRepository.get_fee_summary()
-        return {
+        fee_summary, next_cursor = FeesRepository.get_fee_summary_page(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+        )
+        return FastJSONResponse({
             "fees": fee_summary,
-            "total": len(fee_summary),
+            # Sent with the first page only, like the other paginated lists
+            "total": None if cursor else FeesRepository.count_fee_summary(status),
+            "next_cursor": next_cursor,
             "status": "success",
-        }
+        })
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching fee summary: {str(e)}")
 
 
+@router.get("/fees/overdue")
+def get_overdue_fees(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    min_months: Optional[int] = Query(None, ge=1, description="Only students at least this many months overdue"),
+) -> FastJSONResponse:
+    """Get students with overdue fees, longest overdue first, one page at a time"""
+    try:
+        overdue, next_cursor = FeesRepository.get_overdue_page(
+            limit=limit,
+            cursor=cursor,
+            min_months=min_months,
+        )
+        return FastJSONResponse({
+            "overdue": overdue,
+            # Sent with the first page only, like the other paginated lists
+            "total": None if cursor else FeesRepository.count_overdue(min_months),
+            "next_cursor": next_cursor,
+            "status": "success",
+        })
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching overdue fees: {str(e)}")
+
+
 @router.get("/fees/payments")
-def get_all_payments() -> Dict[str, Any]:
-    """Get all payment records"""
+def get_all_payments(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    payment_method: Optional[str] = None,
+    handled_by: Optional[str] = None,
+    include_denominations: bool = False,
+) -> FastJSONResponse:
+    """Get payment records, latest first, one page at a time"""
     try:
-        payments = FeesRepository.get_all_payments()
-        return {
+        payments, next_cursor = FeesRepository.get_payments_page(
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to,
+            payment_method=payment_method,
+            handled_by=handled_by,
+            include_denominations=include_denominations,
+        )
+        # Counting scans every match, so only the first page pays for it
+        total = None if cursor else FeesRepository.count_payments(
+            date_from=date_from,
+            date_to=date_to,
+            payment_method=payment_method,
+            handled_by=handled_by,
+        )
+        return FastJSONResponse({
             "payments": payments,
-            "total": len(payments),
+            "total": total,
+            "next_cursor": next_cursor,
             "status": "success",
-        }
+        })
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching payments: {str(e)}")
 
 
+@router.get("/fees/reports/collections")
+def get_collection_report(
+    granularity: Literal["day", "month"] = "day",
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    payment_method: Optional[str] = None,
+    handled_by: Optional[str] = None,
+) -> FastJSONResponse:
+    """Get fee collection totals per day or month, by payment method and staff member"""
+    try:
+        report = FeesRepository.get_collections(
+            granularity=granularity,
+            date_from=date_from,
+            date_to=date_to,
+            payment_method=payment_method,
+            handled_by=handled_by,
+        )
+        return FastJSONResponse({
+            "granularity": granularity,
+            **report,
+            "status": "success",
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching collection report: {str(e)}")
+
+
 @router.get("/fees/student/{student_id}")
 def get_student_fee_details(student_id: int) -> Dict[str, Any]:
     """Get detailed fee information for a specific student"""
@@ -1,10 +1,15 @@
-from typing import Any, Dict
+from datetime import date
+from typing import Any, Dict, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 
+from conditional import conditional_get
 from database.enquiry_repository import EnquiryRepository
 from database.followup_repository import FollowupRepository
+from database.pagination import MAX_PAGE_SIZE, InvalidCursor
+from database.writer import write
 from models import FollowupCreate, FollowupUpdate
+from responses import FastJSONResponse
 
 router = APIRouter(prefix="/api", tags=["followups"])
 
@@ -27,7 +32,7 @@ def create_followup(followup: FollowupCreate) -> Dict[str, Any]:
             "handled_by": followup.handled_by,
         }
 
-        followup_id = FollowupRepository.create(followup_data)
+        followup_id = write(FollowupRepository.create, followup_data)
 
         return {
             "message": "Follow-up recorded successfully",
@@ -41,11 +46,45 @@ def create_followup(followup: FollowupCreate) -> Dict[str, Any]:
 
 
 @router.get("/followups")
-def get_all_followups() -> Dict[str, Any]:
-    """Get all follow-up records"""
+def get_all_followups(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Literal["followup_date", "next_followup_date"] = "followup_date",
+    status: Optional[Literal["PENDING", "INTERESTED", "NOT_INTERESTED", "ADMITTED"]] = None,
+    handled_by: Optional[str] = None,
+    followup_from: Optional[date] = None,
+    followup_to: Optional[date] = None,
+    next_from: Optional[date] = None,
+    next_to: Optional[date] = None,
+) -> FastJSONResponse:
+    """List follow-ups a page at a time: latest first, or soonest due first with sort=next_followup_date"""
     try:
-        followups = FollowupRepository.get_all()
-        return {"followups": followups, "total": len(followups)}
+        followups, next_cursor = FollowupRepository.get_page(
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            status=status,
+            handled_by=handled_by,
+            followup_from=followup_from,
+            followup_to=followup_to,
+            next_from=next_from,
+            next_to=next_to,
+        )
+        # Counting scans every match, so only the first page pays for it
+        total = None if cursor else FollowupRepository.count(
+            sort=sort,
+            status=status,
+            handled_by=handled_by,
+            followup_from=followup_from,
+            followup_to=followup_to,
+            next_from=next_from,
+            next_to=next_to,
+        )
+        return FastJSONResponse(
+            {"followups": followups, "total": total, "next_cursor": next_cursor}
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -71,22 +110,28 @@ def get_followups_by_enquiry(enquiry_id: int) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@router.get("/followups/tracker")
-def get_followup_tracker() -> Dict[str, Any]:
+@router.get(
+    "/followups/tracker",
+    dependencies=[conditional_get("student_enquiries", "followups", per_day=True)],
+)
+def get_followup_tracker(response: Response) -> FastJSONResponse:
     """Get enquiries with follow-up summary for the tracker interface"""
     try:
         enquiries = FollowupRepository.get_enquiries_with_followup_summary()
-        return {"enquiries": enquiries, "total": len(enquiries)}
+        return FastJSONResponse(
+            {"enquiries": enquiries, "total": len(enquiries)},
+            headers=response.headers,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 @router.get("/followups/overdue")
-def get_overdue_followups() -> Dict[str, Any]:
+def get_overdue_followups() -> FastJSONResponse:
     """Get enquiries with overdue follow-ups"""
     try:
         overdue = FollowupRepository.get_overdue_followups()
-        return {"overdue_followups": overdue, "total": len(overdue)}
+        return FastJSONResponse({"overdue_followups": overdue, "total": len(overdue)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from metrics import render_metrics
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """Request, query and connection pool metrics in Prometheus text format"""
+    try:
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error collecting metrics: {str(e)}")
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from database.search_repository import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, SearchRepository
+from responses import FastJSONResponse
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+
+@router.get("/search")
+def search_students(
+    q: str = Query(..., min_length=1, description="Name, mobile number, Aadhaar or city prefix"),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+) -> FastJSONResponse:
+    """Search admissions and enquiries, best matches first"""
+    try:
+        results = SearchRepository.search(q, limit)
+        return FastJSONResponse({"results": results, "total": len(results)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -6,6 +6,7 @@ from typing import Any, Dict
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 from fastapi.responses import FileResponse
 
+from conditional import conditional_get
 from database.settings_repository import SettingsRepository
 
 router = APIRouter(prefix="/api", tags=["settings"])
@@ -14,7 +15,7 @@ UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 
-@router.get("/settings/institute")
+@router.get("/settings/institute", dependencies=[conditional_get("institute_settings")])
 def get_institute_settings() -> Dict[str, Any]:
     """Get institute settings"""
     try: